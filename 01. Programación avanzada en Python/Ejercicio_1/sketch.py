@@ -4,7 +4,28 @@ An example of file acommpanies this file: access.log
 """
 
 import re
+import io
+import array
+import calendar
+import os
+import bz2
+import glob
+import gzip
+import lzma
+import math
+import pickle
+import hashlib
+import ipaddress
+import sys
+import time
+import timeit
 import doctest
+from abc import ABC, abstractmethod
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import NamedTuple
+
+import numpy as np
 
 def get_user_agent(line: str) -> str:
     """
@@ -41,8 +62,157 @@ def is_bot(line: str) -> bool:
     >>> is_bot('213.180.203.109 - - [15/Sep/2023:00:12:18 +0200] "GET /robots.txt HTTP/1.1" 302 567 "-" "Mozilla/5.0 (compatible; YandexBot/3.0; +http://yandex.com/bots)"')
     True
     '''
-    user_agent = get_user_agent(line).lower()
-    return 'bot' in user_agent
+    return is_bot_agent(get_user_agent(line))
+
+
+def _signature_pattern(signatures: list[str]) -> str:
+    """
+    Construye una única expresión regular a partir de un trie de las firmas.
+
+    Las firmas que comparten prefijo comparten también la rama de la
+    expresión, así que en cada posición el motor solo prueba los caracteres
+    posibles y no cada firma por separado. Si una firma es prefijo de otra,
+    la más larga sobra: basta con encontrar la corta.
+
+    >>> _signature_pattern(['bot', 'bots', 'crawler', 'crawl', 'spider'])
+    '(?:bot|crawl|spider)'
+    >>> _signature_pattern(['googlebot', 'google-read'])
+    'google(?:\\\\-read|bot)'
+    """
+    trie = {}
+    for signature in signatures:
+        node = trie
+        for ch in signature:
+            node = node.setdefault(ch, {})
+        node[''] = {}
+
+    def build(node: dict) -> str:
+        if '' in node:
+            return ''
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items())]
+        return branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+
+    return build(trie)
+
+
+class BotMatcher:
+    """
+    Clasificador de agentes de usuario a partir de una lista de firmas de bots.
+
+    Todas las firmas se compilan en una sola expresión regular y los
+    resultados se guardan en una caché LRU acotada por agente de usuario,
+    de forma que un agente repetido no vuelve a evaluarse. La comparación no
+    distingue mayúsculas de minúsculas.
+
+    Examples
+    --------
+    >>> matcher = BotMatcher(['bot', 'Crawler', 'python-requests'])
+    >>> matcher('Mozilla/5.0 (compatible; YandexBot/3.0; +http://yandex.com/bots)')
+    True
+    >>> matcher('python-requests/2.25.1')
+    True
+    >>> matcher('Mozilla/5.0 (X11; Ubuntu; Linux x86_64; rv:109.0) Gecko/20100101 Firefox/117.0')
+    False
+    >>> matcher('python-requests/2.25.1')
+    True
+    >>> matcher.cache_info().hits
+    1
+    >>> BotMatcher([])('Googlebot/2.1')
+    False
+    """
+
+    def __init__(self, signatures, cache_size: int = 4096):
+        """
+        Compila las firmas; `cache_size` es el número de agentes recordados.
+        """
+        self._signatures = sorted({s.strip().lower() for s in signatures if s.strip()})
+        self._regex = re.compile(_signature_pattern(self._signatures)) if self._signatures else None
+        self._classify = lru_cache(maxsize=cache_size)(self._match)
+
+    @classmethod
+    def from_file(cls, filename: str, cache_size: int = 4096) -> 'BotMatcher':
+        """
+        Crea el clasificador a partir de un fichero con una firma por línea.
+        Las líneas vacías y las que empiezan por '#' se ignoran.
+
+        >>> BotMatcher.from_file('bots.txt')('Mozilla/5.0 (compatible; SemrushBot/7~bl)')
+        True
+        """
+        with open(filename) as f:
+            signatures = [line for line in f if not line.lstrip().startswith('#')]
+        return cls(signatures, cache_size)
+
+    @property
+    def signatures(self) -> list[str]:
+        """
+        Obtiene las firmas (en minúsculas) que reconoce el clasificador.
+        """
+        return self._signatures
+
+    @property
+    def cache_size(self) -> int:
+        """
+        Obtiene el número de agentes de usuario distintos que se recuerdan.
+        """
+        return self._classify.cache_parameters()['maxsize']
+
+    def _match(self, user_agent: str) -> bool:
+        return self._regex is not None and self._regex.search(user_agent.lower()) is not None
+
+    def __call__(self, user_agent: str) -> bool:
+        return self._classify(user_agent)
+
+    def cache_info(self):
+        """
+        Estadísticas de la caché (aciertos, fallos, tamaño).
+        """
+        return self._classify.cache_info()
+
+
+DEFAULT_BOT_SIGNATURES = ('bot',)
+
+_bot_matcher = BotMatcher(DEFAULT_BOT_SIGNATURES)
+
+
+def use_bot_signatures(filename: str | None = None, cache_size: int = 4096) -> None:
+    '''
+    Sustituye las firmas de bots que usan `is_bot` y los agregadores por las
+    del fichero indicado. Sin fichero se vuelve a las firmas por defecto,
+    que solo reconocen 'bot'.
+
+    Args:
+    filename (str | None): fichero con una firma por línea.
+    cache_size (int): número de agentes de usuario distintos recordados.
+    '''
+    global _bot_matcher
+    if filename is None:
+        _bot_matcher = BotMatcher(DEFAULT_BOT_SIGNATURES, cache_size)
+    else:
+        _bot_matcher = BotMatcher.from_file(filename, cache_size)
+
+
+def _install_bot_matcher(signatures: list[str], cache_size: int) -> None:
+    """
+    Inicializa cada proceso de trabajo con las firmas del proceso principal,
+    que no se heredan si los procesos no se crean con fork.
+    """
+    global _bot_matcher
+    _bot_matcher = BotMatcher(signatures, cache_size)
+
+
+def is_bot_agent(user_agent: str) -> bool:
+    '''
+    Determina si un agente de usuario corresponde a un bot.
+
+    Examples
+    --------
+    >>> is_bot_agent('Mozilla/5.0 (compatible; YandexBot/3.0; +http://yandex.com/bots)')
+    True
+
+    >>> is_bot_agent('python-requests/2.25.1')
+    False
+    '''
+    return _bot_matcher(user_agent)
 
 
 def get_ipaddr(line: str) -> str:
@@ -83,46 +253,1424 @@ def get_hour(line: str) -> int:
         return -1
 
 
-def histbyhour(filename: str) -> dict[int, int]:
+class LogRecord(NamedTuple):
+    """
+    Línea del registro ya analizada, con los campos que usan los agregadores.
+    `malformed` indica que la línea no sigue el formato combinado de Apache.
+    """
+    ip: str
+    timestamp: str
+    hour: int
+    request: str
+    status: int
+    size: int
+    referer: str
+    user_agent: str
+    bot: bool
+    malformed: bool = False
+
+
+class MalformedLineError(ValueError):
+    """
+    Línea que no sigue el formato combinado (Combined Log Format) de Apache.
+    """
+
+
+# Patrón anclado al principio y al final sin cuantificadores que puedan
+# retroceder entre campos: cada grupo se detiene en su delimitador. Los
+# campos entre comillas admiten comillas escapadas (\"), como las escribe
+# Apache, en forma "desenrollada": los tramos sin barras ni comillas se
+# consumen de una vez y solo cada escape es un paso aparte.
+_QUOTED = r'"([^"\\]*(?:\\.[^"\\]*)*)"'
+_LINE_RE = re.compile(
+    r'(\S+) \S+ \S+ '
+    r'\[(\d\d/\w\w\w/\d{4}:(\d\d):\d\d:\d\d [^\]]*)\] '
+    + _QUOTED + r' (\d{3}) (\d+|-) '
+    + _QUOTED + ' ' + _QUOTED + '$'
+)
+
+
+def parse_line(line: str, strict: bool = False) -> LogRecord:
+    """
+    Analiza una línea del registro una sola vez y devuelve todos sus campos.
+
+    Las líneas que no siguen el formato combinado de Apache se marcan con
+    `malformed=True` (o lanzan `MalformedLineError` con `strict=True`) y sus
+    campos se obtienen con las funciones auxiliares, de modo que los
+    resultados de `histbyhour` e `ipaddreses` no cambian.
+
+    Args:
+    line (str): Una cadena del archivo de registro.
+    strict (bool): lanzar una excepción si la línea está mal formada.
+
+    Returns:
+    LogRecord: Los campos de la línea. `status` vale -1 si no se encuentra.
+
+    Raises:
+    MalformedLineError: si `strict` y la línea no tiene el formato esperado.
+
+    Examples
+    --------
+    >>> r = parse_line('66.249.66.35 - - [15/Sep/2023:00:18:46 +0200] "GET /~luis/sw05-06/libre_m2_baja.pdf HTTP/1.1" 200 5940849 "-" "Mozilla/5.0 (compatible; Googlebot/2.1; +http://www.google.com/bot.html)"')
+    >>> r.ip, r.hour, r.status, r.size, r.bot
+    ('66.249.66.35', 0, 200, 5940849, True)
+
+    >>> r = parse_line('189.217.221.3 - - [09/Oct/2023:02:39:44 +0200] "-" 408 0 "-" "-"')
+    >>> r.request, r.status, r.user_agent, r.bot
+    ('-', 408, '-', False)
+
+    >>> parse_line('línea rota')
+    LogRecord(ip='línea', timestamp='', hour=-1, request='', status=-1, size=0, referer='', user_agent='', bot=False, malformed=True)
+
+    >>> parse_line('línea rota', strict=True) # doctest: +IGNORE_EXCEPTION_DETAIL
+    Traceback (most recent call last):
+    ...
+    MalformedLineError: línea mal formada: 'línea rota'
+    """
+    line = line.rstrip('\r\n')
+    match = _LINE_RE.match(line)
+    if match is not None:
+        ip, timestamp, hour, request, status, size, referer, user_agent = match.groups()
+        return LogRecord(ip, timestamp, int(hour), request, int(status),
+                         0 if size == '-' else int(size), referer, user_agent,
+                         is_bot_agent(user_agent))
+    if strict:
+        raise MalformedLineError(f"línea mal formada: {line!r}")
+    user_agent = get_user_agent(line)
+    return LogRecord(get_ipaddr(line) if line.strip() else '', '', get_hour(line), '', -1, 0, '',
+                     user_agent, is_bot_agent(user_agent), True)
+
+
+_LINE_RE_BYTES = re.compile(_LINE_RE.pattern.encode())
+
+
+@lru_cache(maxsize=1 << 16)
+def _text(field: bytes) -> str:
+    """
+    Decodifica un campo que se repite mucho (IP, referer, agente de usuario)
+    una sola vez por valor distinto. Los bytes no válidos se sustituyen.
+    """
+    return field.decode('utf-8', 'replace')
+
+
+def parse_bytes(line: bytes, strict: bool = False) -> LogRecord:
+    """
+    Igual que `parse_line`, pero a partir de los bytes de la línea.
+
+    Los campos se separan sobre los bytes y solo se decodifican los campos de
+    texto, cada valor repetido una única vez; los números se convierten
+    directamente. Los bytes que no son UTF-8 válido se sustituyen por '\\ufffd'
+    en lugar de interrumpir el análisis.
+
+    Args:
+    line (bytes): Una línea del archivo de registro.
+    strict (bool): lanzar una excepción si la línea está mal formada.
+
+    Returns:
+    LogRecord: Los campos de la línea.
+
+    Examples
+    --------
+    >>> r = parse_bytes(b'1.2.3.4 - - [09/Oct/2023:05:22:57 +0200] "GET /\\xff HTTP/1.1" 200 336 "-" "Googlebot/2.1"\\n')
+    >>> r.ip, r.hour, r.request == 'GET /\\ufffd HTTP/1.1', r.status, r.bot
+    ('1.2.3.4', 5, True, 200, True)
+
+    >>> parse_bytes(b'\\xffrota').malformed
+    True
+    """
+    line = line.rstrip(b'\r\n')
+    match = _LINE_RE_BYTES.match(line)
+    if match is not None:
+        ip, timestamp, hour, request, status, size, referer, user_agent = match.groups()
+        user_agent = _text(user_agent)
+        return LogRecord(_text(ip), timestamp.decode('utf-8', 'replace'), int(hour),
+                         request.decode('utf-8', 'replace'), int(status),
+                         0 if size == b'-' else int(size), _text(referer), user_agent,
+                         is_bot_agent(user_agent))
+    return parse_line(line.decode('utf-8', 'replace'), strict)
+
+
+@lru_cache(maxsize=None)
+def _bytes_parser(fields: frozenset[str]):
     '''
-    Genera un histórico de accesos por hora a partir de un registro.
+    Devuelve una función como `parse_bytes` que solo decodifica y convierte
+    los campos de `fields`; los demás valen None (salvo en las líneas mal
+    formadas, que se analizan completas). `bot` necesita el agente de usuario.
+
+    Examples
+    --------
+    >>> line = b'1.2.3.4 - - [09/Oct/2023:05:22:57 +0200] "GET / HTTP/1.1" 200 336 "-" "Googlebot/2.1"'
+    >>> _bytes_parser(frozenset({'hour', 'bot'}))(line)
+    LogRecord(ip=None, timestamp=None, hour=5, request=None, status=None, size=None, referer=None, user_agent=None, bot=True, malformed=False)
+    >>> _bytes_parser(frozenset(LogRecord._fields)) is parse_bytes
+    True
+    '''
+    if fields >= set(LogRecord._fields) - {'malformed'}:
+        return parse_bytes
+    (want_ip, want_timestamp, want_hour, want_request, want_status, want_size, want_referer,
+     want_agent, want_bot, _) = (name in fields for name in LogRecord._fields)
+    match_line = _LINE_RE_BYTES.match
+
+    def parse(line: bytes, strict: bool = False) -> LogRecord:
+        line = line.rstrip(b'\r\n')
+        match = match_line(line)
+        if match is None:
+            return parse_line(line.decode('utf-8', 'replace'), strict)
+        ip, timestamp, hour, request, status, size, referer, user_agent = match.groups()
+        user_agent = _text(user_agent) if want_agent or want_bot else None
+        return LogRecord(_text(ip) if want_ip else None,
+                         timestamp.decode('utf-8', 'replace') if want_timestamp else None,
+                         int(hour) if want_hour else None,
+                         request.decode('utf-8', 'replace') if want_request else None,
+                         int(status) if want_status else None,
+                         (0 if size == b'-' else int(size)) if want_size else None,
+                         _text(referer) if want_referer else None,
+                         user_agent if want_agent else None,
+                         is_bot_agent(user_agent) if want_bot else None)
+    return parse
+
+
+_IPV6_FLAG = 1 << 128
+
+
+@lru_cache(maxsize=1 << 16)
+def pack_ip(ip: str) -> int | str:
+    '''
+    Convierte una dirección IP en un entero: el de la IPv4 tal cual y el de
+    la IPv6 marcado con el bit 128 para distinguirlas. Las cadenas que no son
+    una IP en forma canónica se devuelven sin cambios, de modo que
+    `unpack_ip` siempre recupera el texto original.
+
+    Examples
+    --------
+    >>> pack_ip('147.96.46.52')
+    2472554036
+    >>> pack_ip('2001:db8::1') > 1 << 128
+    True
+    >>> pack_ip('línea')
+    'línea'
+    '''
+    try:
+        address = ipaddress.ip_address(ip)
+    except ValueError:
+        return ip
+    if str(address) != ip:
+        return ip
+    return int(address) | (_IPV6_FLAG if address.version == 6 else 0)
+
+
+def unpack_ip(packed: int | str) -> str:
+    '''
+    Operación inversa de `pack_ip`.
+
+    >>> unpack_ip(pack_ip('147.96.46.52')), unpack_ip(pack_ip('2001:db8::1'))
+    ('147.96.46.52', '2001:db8::1')
+    '''
+    if isinstance(packed, str):
+        return packed
+    if packed & _IPV6_FLAG:
+        return str(ipaddress.IPv6Address(packed ^ _IPV6_FLAG))
+    return str(ipaddress.IPv4Address(packed))
+
+
+_MASK64 = (1 << 64) - 1
+
+
+def _hash64(item: int | str) -> int:
+    """
+    Hash de 64 bits que no depende del proceso (a diferencia de `hash`), para
+    poder combinar sketches calculados en procesos distintos. Los enteros se
+    mezclan con splitmix64 y las cadenas con blake2b.
+    """
+    if isinstance(item, str):
+        return int.from_bytes(hashlib.blake2b(item.encode(), digest_size=8).digest(), 'big')
+    x = (item ^ (item >> 64) ^ (item >> 128)) & _MASK64
+    x = (x + 0x9E3779B97F4A7C15) & _MASK64
+    x = ((x ^ (x >> 30)) * 0xBF58476D1CE4E5B9) & _MASK64
+    x = ((x ^ (x >> 27)) * 0x94D049BB133111EB) & _MASK64
+    return x ^ (x >> 31)
+
+
+class HyperLogLog:
+    """
+    Estimador de la cantidad de elementos distintos con memoria fija.
+
+    Usa 2**precision registros de un byte; el error relativo típico es
+    1.04 / sqrt(2**precision), alrededor del 0.8 % con la precisión 14 por
+    defecto (16 KiB). Dos sketches con la misma precisión se pueden combinar
+    con `merge`, también si se han calculado en procesos distintos.
+
+    Examples
+    --------
+    >>> a, b = HyperLogLog(), HyperLogLog()
+    >>> for i in range(50000):
+    ...     a.add(i)
+    ...     b.add(i + 25000)
+    >>> abs(a.count() - 50000) / 50000 < 0.03
+    True
+    >>> a.merge(b)
+    >>> abs(a.count() - 75000) / 75000 < 0.03
+    True
+    >>> HyperLogLog(3)
+    Traceback (most recent call last):
+    ...
+    ValueError: La precisión debe estar entre 4 y 18, no 3
+    """
+
+    def __init__(self, precision: int = 14):
+        """
+        Crea un sketch vacío con 2**precision registros.
+        """
+        if not 4 <= precision <= 18:
+            raise ValueError(f"La precisión debe estar entre 4 y 18, no {precision}")
+        self._precision = precision
+        self._registers = bytearray(1 << precision)
+
+    @property
+    def precision(self) -> int:
+        """
+        Obtiene la precisión (número de bits del índice de registro).
+        """
+        return self._precision
+
+    def add(self, item: int | str) -> None:
+        """
+        Añade un elemento (un entero, como los de `pack_ip`, o una cadena).
+        """
+        h = _hash64(item)
+        index = h >> (64 - self._precision)
+        rest = h & ((1 << (64 - self._precision)) - 1)
+        rank = 64 - self._precision - rest.bit_length() + 1
+        if rank > self._registers[index]:
+            self._registers[index] = rank
+
+    def merge(self, other: 'HyperLogLog') -> None:
+        """
+        Combina otro sketch con este (unión de los conjuntos).
+        """
+        if other._precision != self._precision:
+            raise ValueError(f"No se pueden combinar precisiones distintas: {self._precision} != {other._precision}")
+        self._registers = bytearray(map(max, self._registers, other._registers))
+
+    def count(self) -> int:
+        """
+        Estima el número de elementos distintos añadidos.
+        """
+        m = len(self._registers)
+        alpha = {16: 0.673, 32: 0.697, 64: 0.709}.get(m, 0.7213 / (1 + 1.079 / m))
+        estimate = alpha * m * m / sum(2.0 ** -r for r in self._registers)
+        zeros = self._registers.count(0)
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * math.log(m / zeros)
+        return round(estimate)
+
+    def __len__(self) -> int:
+        return self.count()
+
+
+class Aggregator(ABC):
+    """
+    Métrica que se alimenta de registros durante una única pasada por el fichero.
+
+    Las subclases implementan `update` para acumular un registro, `merge` para
+    combinar el estado de otra instancia del mismo tipo y `result` para
+    devolver el valor final. `fields` son los campos de `LogRecord` que lee
+    `update`: en una pasada solo se decodifican los que pide algún agregador
+    y los demás llegan como None.
+
+    Cada línea se valida entera contra el formato combinado, así que una
+    métrica sola (`histbyhour`) es más lenta que buscar solo su campo como
+    hacía `get_hour`: en un registro de 35 MB, unos 1,1 s frente a 0,74 s. La
+    ventaja está en calcular varias métricas con una sola pasada.
+
+    >>> Aggregator()  # doctest: +IGNORE_EXCEPTION_DETAIL
+    Traceback (most recent call last):
+    ...
+    TypeError: Can't instantiate abstract class Aggregator
+    """
+
+    fields: frozenset[str] = frozenset(LogRecord._fields)
+
+    @abstractmethod
+    def update(self, record: LogRecord) -> None:
+        """
+        Acumula un registro.
+        """
+
+    @abstractmethod
+    def merge(self, other: 'Aggregator') -> None:
+        """
+        Añade el estado de otra instancia del mismo tipo.
+        """
+
+    @abstractmethod
+    def result(self):
+        """
+        Devuelve el valor final.
+        """
+
+
+class HourHistogram(Aggregator):
+    """
+    Número de accesos por hora (-1 para las líneas sin hora).
+
+    >>> agg = HourHistogram()
+    >>> agg.update(parse_line('1.2.3.4 - - [09/Oct/2023:05:22:57 +0200] "GET / HTTP/1.1" 200 336 "-" "curl/8.0"'))
+    >>> agg.update(parse_line('sin hora'))
+    >>> agg.result()
+    {5: 1, -1: 1}
+    """
+
+    fields = frozenset({'hour'})
+
+    def __init__(self):
+        self._hist = {}
+
+    def update(self, record: LogRecord) -> None:
+        self._hist[record.hour] = self._hist.get(record.hour, 0) + 1
+
+    def merge(self, other: 'HourHistogram') -> None:
+        for hour, count in other._hist.items():
+            self._hist[hour] = self._hist.get(hour, 0) + count
+
+    def result(self) -> dict[int, int]:
+        return self._hist
+
+
+class NonBotIPs(Aggregator):
+    """
+    Conjunto de direcciones IP de los accesos que no son bots.
+
+    Las IPs se guardan como enteros (`pack_ip`), que ocupan bastante menos
+    que las cadenas, y se convierten de nuevo a texto en `result`.
+
+    >>> agg = NonBotIPs()
+    >>> agg.update(parse_line('1.2.3.4 - - [09/Oct/2023:05:22:57 +0200] "GET / HTTP/1.1" 200 336 "-" "curl/8.0"'))
+    >>> agg.update(parse_line('5.6.7.8 - - [09/Oct/2023:05:22:57 +0200] "GET / HTTP/1.1" 200 336 "-" "GPTBot/1.0"'))
+    >>> agg.result()
+    {'1.2.3.4'}
+    """
+
+    fields = frozenset({'ip', 'bot'})
+
+    def __init__(self):
+        self._ips = set()
+
+    def update(self, record: LogRecord) -> None:
+        if not record.bot:
+            self._ips.add(pack_ip(record.ip))
+
+    def merge(self, other: 'NonBotIPs') -> None:
+        self._ips |= other._ips
+
+    def result(self) -> set[str]:
+        return {unpack_ip(ip) for ip in self._ips}
+
+
+class NonBotIPCount(Aggregator):
+    """
+    Número aproximado de IPs distintas que no son bots, con memoria fija
+    (`HyperLogLog`) en lugar de un conjunto con todas ellas.
+
+    >>> agg = NonBotIPCount(precision=10)
+    >>> agg.update(parse_line('1.2.3.4 - - [09/Oct/2023:05:22:57 +0200] "GET / HTTP/1.1" 200 336 "-" "curl/8.0"'))
+    >>> agg.update(parse_line('1.2.3.4 - - [09/Oct/2023:05:22:58 +0200] "GET / HTTP/1.1" 200 336 "-" "curl/8.0"'))
+    >>> agg.result()
+    1
+    """
+
+    fields = frozenset({'ip', 'bot'})
+
+    def __init__(self, precision: int = 14):
+        self._sketch = HyperLogLog(precision)
+
+    def update(self, record: LogRecord) -> None:
+        if not record.bot:
+            self._sketch.add(pack_ip(record.ip))
+
+    def merge(self, other: 'NonBotIPCount') -> None:
+        self._sketch.merge(other._sketch)
+
+    def result(self) -> int:
+        return self._sketch.count()
+
+
+class StatusCodes(Aggregator):
+    """
+    Número de respuestas por código de estado HTTP (-1 si no se encuentra).
+
+    >>> agg = StatusCodes()
+    >>> agg.update(parse_line('1.2.3.4 - - [09/Oct/2023:05:22:57 +0200] "GET / HTTP/1.1" 404 336 "-" "curl/8.0"'))
+    >>> agg.result()
+    {404: 1}
+    """
+
+    fields = frozenset({'status'})
+
+    def __init__(self):
+        self._codes = {}
+
+    def update(self, record: LogRecord) -> None:
+        self._codes[record.status] = self._codes.get(record.status, 0) + 1
+
+    def merge(self, other: 'StatusCodes') -> None:
+        for status, count in other._codes.items():
+            self._codes[status] = self._codes.get(status, 0) + count
+
+    def result(self) -> dict[int, int]:
+        return self._codes
+
+
+class BytesServed(Aggregator):
+    """
+    Total de bytes servidos (las respuestas con tamaño '-' cuentan como 0).
+
+    >>> agg = BytesServed()
+    >>> agg.update(parse_line('1.2.3.4 - - [09/Oct/2023:05:22:57 +0200] "GET / HTTP/1.1" 200 336 "-" "curl/8.0"'))
+    >>> agg.update(parse_line('1.2.3.4 - - [09/Oct/2023:05:22:58 +0200] "GET / HTTP/1.1" 304 - "-" "curl/8.0"'))
+    >>> agg.result()
+    336
+    """
+
+    fields = frozenset({'size'})
+
+    def __init__(self):
+        self._total = 0
+
+    def update(self, record: LogRecord) -> None:
+        self._total += record.size
+
+    def merge(self, other: 'BytesServed') -> None:
+        self._total += other._total
+
+    def result(self) -> int:
+        return self._total
+
+
+class MalformedLines(Aggregator):
+    """
+    Número de líneas que no siguen el formato combinado de Apache.
+
+    >>> agg = MalformedLines()
+    >>> agg.update(parse_line('1.2.3.4 - - [09/Oct/2023:05:22:57 +0200] "GET / HTTP/1.1" 200 336 "-" "curl/8.0"'))
+    >>> agg.update(parse_line('línea rota'))
+    >>> agg.result()
+    1
+    """
+
+    fields = frozenset({'malformed'})
+
+    def __init__(self):
+        self._count = 0
+
+    def update(self, record: LogRecord) -> None:
+        self._count += record.malformed
+
+    def merge(self, other: 'MalformedLines') -> None:
+        self._count += other._count
+
+    def result(self) -> int:
+        return self._count
+
+
+def _feed(lines, aggregators: dict[str, Aggregator], parse=None) -> None:
+    """
+    Analiza cada línea una vez y pasa el registro a todos los agregadores.
+    Por defecto solo se extraen los campos que piden los agregadores.
+    """
+    if parse is None:
+        parse = _bytes_parser(frozenset().union(*(aggregator.fields for aggregator in aggregators.values())))
+    updates = [aggregator.update for aggregator in aggregators.values()]
+    for line in lines:
+        record = parse(line)
+        for update in updates:
+            update(record)
+
+
+def split_ranges(filename: str, n: int, size: int | None = None) -> list[tuple[int, int]]:
+    '''
+    Divide el fichero en como mucho `n` rangos de bytes que empiezan y
+    terminan en un salto de línea, de forma que ninguna línea queda partida.
 
     Args:
     filename (str): la ruta del archivo de registro.
+    n (int): número de rangos deseado.
+    size (int | None): bytes del fichero que se reparten; por defecto, su
+    tamaño actual.
 
     Returns:
-    Dict[int, int]: Un diccionario con las horas únicas como claves y sus correspondientes cantidades de accesos como valores.
+    list[tuple[int, int]]: pares (inicio, fin) consecutivos que cubren el fichero.
+
+    Examples
+    --------
+    >>> split_ranges('access_short.log', 1)
+    [(0, 998)]
+    >>> ranges = split_ranges('access_short.log', 4)
+    >>> ranges[0][0], ranges[-1][1], all(a[1] == b[0] for a, b in zip(ranges, ranges[1:]))
+    (0, 998, True)
+    >>> split_ranges('access_short.log', 4, 500)[-1][1]
+    500
+    '''
+    if size is None:
+        size = os.path.getsize(filename)
+    bounds = [0]
+    with open(filename, 'rb') as f:
+        for i in range(1, n):
+            f.seek(max(size * i // n - 1, bounds[-1]))
+            f.readline()
+            pos = f.tell()
+            if bounds[-1] < pos < size:
+                bounds.append(pos)
+    bounds.append(size)
+    return list(zip(bounds, bounds[1:]))
+
+
+_MAGIC = (
+    (b'\x1f\x8b', 'gzip'),
+    (b'BZh', 'bz2'),
+    (b'\xfd7zXZ\x00', 'xz'),
+    (b'\x28\xb5\x2f\xfd', 'zstd'),
+)
+
+READ_BUFFER = 1 << 20
+
+
+def compression(filename: str) -> str | None:
+    '''
+    Detecta el formato de compresión del fichero por sus primeros bytes.
+
+    Args:
+    filename (str): la ruta del archivo de registro.
+
+    Returns:
+    str | None: 'gzip', 'bz2', 'xz', 'zstd' o None si no está comprimido.
+
+    Examples
+    --------
+    >>> compression('access.log') is None
+    True
+    '''
+    with open(filename, 'rb') as f:
+        head = f.read(6)
+    for magic, name in _MAGIC:
+        if head.startswith(magic):
+            return name
+    return None
+
+
+def open_log(filename: str, binary: bool = False):
+    '''
+    Abre un registro, descomprimiéndolo al vuelo si hace falta.
+
+    La descompresión se hace por bloques de `READ_BUFFER` bytes, sin pasar
+    por un fichero intermedio. El formato zstd necesita el paquete opcional
+    `zstandard`.
+
+    Args:
+    filename (str): la ruta del archivo de registro.
+    binary (bool): devolver un flujo de bytes en lugar de uno de texto.
+
+    Returns:
+    TextIO | BinaryIO: el fichero abierto para leer líneas o bloques.
+
+    Raises:
+    ModuleNotFoundError: si el fichero es zstd y no está instalado `zstandard`.
+
+    Examples
+    --------
+    >>> with open_log('access_short.log') as f:
+    ...     len(f.readlines())
+    6
+    '''
+    kind = compression(filename)
+    if kind is None:
+        return open(filename, 'rb' if binary else 'r', buffering=READ_BUFFER)
+    if kind == 'gzip':
+        raw = gzip.GzipFile(filename, 'rb')
+    elif kind == 'bz2':
+        raw = bz2.BZ2File(filename, 'rb')
+    elif kind == 'xz':
+        raw = lzma.LZMAFile(filename, 'rb')
+    else:
+        try:
+            import zstandard
+        except ModuleNotFoundError:
+            raise ModuleNotFoundError(f"se necesita el paquete zstandard para leer {filename}")
+        raw = zstandard.ZstdDecompressor().stream_reader(open(filename, 'rb'), closefd=True)
+    stream = io.BufferedReader(raw, buffer_size=READ_BUFFER)
+    return stream if binary else io.TextIOWrapper(stream)
+
+
+def _rotation_key(path: str) -> int:
+    """
+    Orden de los ficheros rotados: primero los más antiguos (`access.log.3.gz`,
+    `access.log.2.gz`, ...) y al final el actual (`access.log`).
+
+    >>> sorted(['access.log', 'access.log.1', 'access.log.10.gz', 'access.log.2.gz'], key=_rotation_key)
+    ['access.log.10.gz', 'access.log.2.gz', 'access.log.1', 'access.log']
+    """
+    match = re.search(r'\.(\d+)(\.(gz|bz2|xz|zst))?$', path)
+    return -int(match.group(1)) if match else 0
+
+
+def expand_logs(filename) -> list[str]:
+    '''
+    Convierte una ruta, un patrón glob o una lista de ellos en la lista de
+    ficheros que forman un único registro lógico.
+
+    Los patrones se expanden en orden de rotación (los más antiguos antes);
+    las listas conservan el orden indicado.
+
+    Args:
+    filename (str | list[str]): ruta, patrón o lista de rutas y patrones.
+
+    Returns:
+    list[str]: las rutas de los ficheros en el orden en que se leen.
+
+    Examples
+    --------
+    >>> expand_logs('access*.log')
+    ['access.log', 'access_short.log']
+    >>> expand_logs(['access_short.log', 'access.log'])
+    ['access_short.log', 'access.log']
+    '''
+    if isinstance(filename, (str, os.PathLike)):
+        filename = [filename]
+    paths = []
+    for name in filename:
+        name = os.fspath(name)
+        if any(ch in name for ch in '*?['):
+            paths.extend(sorted(sorted(glob.glob(name)), key=_rotation_key))
+        else:
+            paths.append(name)
+    return paths
+
+
+def _byte_lines(f, size: int | None = None):
+    """
+    Genera las líneas (en bytes, sin el salto de línea) de un flujo binario
+    leyéndolo por bloques de `READ_BUFFER` bytes. Con `size` se leen como
+    mucho esos bytes.
+
+    >>> with open('access_short.log', 'rb') as f:
+    ...     lines = list(_byte_lines(f))
+    >>> len(lines), lines[0][:13]
+    (6, b'39.103.168.88')
+    """
+    tail = b''
+    while size is None or size > 0:
+        block = f.read(READ_BUFFER if size is None else min(READ_BUFFER, size))
+        if not block:
+            break
+        if size is not None:
+            size -= len(block)
+        lines = (tail + block).split(b'\n')
+        tail = lines.pop()
+        yield from lines
+    if tail:
+        yield tail
+
+
+def _read_range(filename: str, start: int, end: int | None):
+    """
+    Genera las líneas en bytes del fichero comprendidas en [start, end).
+    Con `end=None` se lee el fichero completo, comprimido o no.
+    """
+    if end is None:
+        with open_log(filename, binary=True) as f:
+            yield from _byte_lines(f)
+        return
+    with open(filename, 'rb') as f:
+        f.seek(start)
+        yield from _byte_lines(f, end - start)
+
+
+def _analyze_range(filename: str, start: int, end: int | None,
+                   aggregators: dict[str, Aggregator]) -> dict[str, Aggregator]:
+    """
+    Trabajo de cada proceso: alimenta sus propios agregadores con un rango.
+    """
+    _feed(_read_range(filename, start, end), aggregators)
+    return aggregators
+
+
+def _analyze_paths(paths: list[str], aggregators: dict[str, Aggregator], workers: int,
+                   mp_context=None, sizes: dict[str, int] | None = None) -> None:
+    """
+    Alimenta los agregadores con los ficheros indicados, en serie o repartidos
+    entre `workers` procesos (creados con `mp_context` si se indica). Los
+    procesos usan las mismas firmas de bots que el proceso principal.
+
+    `sizes` limita los ficheros sin comprimir a los bytes indicados por ruta,
+    de modo que lo que se añada mientras se leen no se procesa.
+    """
+    sizes = sizes or {}
+    if workers > 1:
+        tasks = []
+        for path in paths:
+            if compression(path) is None:
+                tasks.extend((path, start, end)
+                             for start, end in split_ranges(path, workers, sizes.get(path)))
+            else:
+                tasks.append((path, 0, None))
+        with ProcessPoolExecutor(max_workers=max(1, min(workers, len(tasks))), mp_context=mp_context,
+                                 initializer=_install_bot_matcher,
+                                 initargs=(_bot_matcher.signatures, _bot_matcher.cache_size)) as pool:
+            futures = [pool.submit(_analyze_range, path, start, end, aggregators)
+                       for path, start, end in tasks]
+            partials = [future.result() for future in futures]
+        # Se combina cuando ya han terminado todos: los agregadores se
+        # envían a los procesos vacíos y no deben modificarse antes.
+        for partial in partials:
+            for name, aggregator in aggregators.items():
+                aggregator.merge(partial[name])
+    else:
+        for path in paths:
+            end = sizes.get(path) if compression(path) is None else None
+            _feed(_read_range(path, 0, end), aggregators)
+
+
+FINGERPRINT_BLOCK = 1 << 16
+
+
+def fingerprint(filename: str, size: int) -> tuple[str, str]:
+    '''
+    Huella de los primeros `size` bytes del fichero: el hash del bloque
+    inicial y el del bloque que termina en `size`, de `FINGERPRINT_BLOCK`
+    bytes como mucho cada uno.
+
+    Args:
+    filename (str): la ruta del archivo de registro.
+    size (int): número de bytes del fichero que se consideran.
+
+    Returns:
+    tuple[str, str]: hash del bloque inicial y del final.
+
+    Examples
+    --------
+    >>> fingerprint('access_short.log', 998) == fingerprint('access_short.log', 998)
+    True
+    >>> fingerprint('access_short.log', 998) == fingerprint('access_short.log', 500)
+    False
+    '''
+    with open(filename, 'rb') as f:
+        head = f.read(min(FINGERPRINT_BLOCK, size))
+        f.seek(max(0, size - FINGERPRINT_BLOCK))
+        tail = f.read(size - f.tell())
+    return hashlib.sha1(head).hexdigest(), hashlib.sha1(tail).hexdigest()
+
+
+class AnalysisCache:
+    """
+    Caché en disco de los agregadores calculados para cada fichero.
+
+    Cada entrada se identifica por la ruta absoluta del fichero, los
+    agregadores pedidos y las firmas de bots en uso, y guarda el tamaño, la
+    fecha de modificación y la huella (`fingerprint`) del fichero junto con el
+    estado de los agregadores. Si el fichero no ha cambiado se reutiliza el
+    estado; si solo ha crecido por el final (un registro al que se siguen
+    añadiendo líneas) se procesan únicamente los bytes nuevos y se combinan
+    con el estado guardado.
+
+    Examples
+    --------
+    >>> import tempfile
+    >>> with tempfile.TemporaryDirectory() as tmp:
+    ...     cache = AnalysisCache(tmp)
+    ...     first = analyze('access_short.log', {'hist': HourHistogram()}, cache=cache)
+    ...     again = analyze('access_short.log', {'hist': HourHistogram()}, cache=cache)
+    >>> first == again == {'hist': {5: 3, 7: 2, 23: 1}}, cache.hits
+    (True, 1)
+    """
+
+    def __init__(self, directory: str):
+        """
+        Usa (y crea si no existe) el directorio indicado para las entradas.
+        """
+        os.makedirs(directory, exist_ok=True)
+        self._directory = directory
+        self.hits = 0
+        self.appends = 0
+        self.misses = 0
+
+    def _entry_path(self, filename: str, template: bytes) -> str:
+        key = hashlib.sha256()
+        key.update(os.path.abspath(filename).encode())
+        key.update(template)
+        key.update('\n'.join(_bot_matcher.signatures).encode())
+        return os.path.join(self._directory, key.hexdigest() + '.pickle')
+
+    def _load(self, entry_path: str) -> dict | None:
+        try:
+            with open(entry_path, 'rb') as f:
+                return pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return None
+
+    def _save(self, entry_path: str, entry: dict) -> None:
+        tmp = f'{entry_path}.{os.getpid()}.tmp'
+        with open(tmp, 'wb') as f:
+            pickle.dump(entry, f, pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, entry_path)
+
+    def analyze(self, filename: str, template: bytes, workers: int = 1) -> dict[str, Aggregator]:
+        """
+        Devuelve los agregadores calculados sobre un fichero, usando la caché.
+
+        `template` son los agregadores vacíos serializados con `pickle`; se
+        usan como clave y como punto de partida si hay que recalcular.
+        """
+        entry_path = self._entry_path(filename, template)
+        st = os.stat(filename)
+        entry = self._load(entry_path)
+        if entry is not None:
+            if entry['size'] == st.st_size and entry['mtime_ns'] == st.st_mtime_ns \
+                    and entry['fingerprint'] == fingerprint(filename, st.st_size):
+                self.hits += 1
+                return entry['state']
+            if entry['appendable'] and st.st_size > entry['size'] and compression(filename) is None \
+                    and entry['fingerprint'] == fingerprint(filename, entry['size']):
+                self.appends += 1
+                state = entry['state']
+                _feed(_read_range(filename, entry['size'], st.st_size), state)
+                self._store(entry_path, filename, st, state)
+                return state
+        self.misses += 1
+        state = pickle.loads(template)
+        # Solo hasta el tamaño medido, también al repartir entre procesos: lo
+        # que se añada después se procesará en la siguiente llamada.
+        _analyze_paths([filename], state, workers, sizes={filename: st.st_size})
+        self._store(entry_path, filename, st, state)
+        return state
+
+    def _store(self, entry_path: str, filename: str, st: os.stat_result,
+               state: dict[str, Aggregator]) -> None:
+        # Solo se puede continuar por el final si la última línea estaba completa.
+        appendable = False
+        if compression(filename) is None:
+            with open(filename, 'rb') as f:
+                f.seek(max(0, st.st_size - 1))
+                appendable = f.read(1) == b'\n'
+        self._save(entry_path, {'size': st.st_size, 'mtime_ns': st.st_mtime_ns,
+                                'fingerprint': fingerprint(filename, st.st_size),
+                                'appendable': appendable, 'state': state})
+
+
+def analyze(filename, aggregators: dict[str, Aggregator], workers: int = 1,
+            cache: 'AnalysisCache | str | None' = None) -> dict:
+    '''
+    Recorre el registro una única vez y alimenta todos los agregadores.
+
+    Cada línea se analiza con `parse_line` una sola vez y el registro
+    resultante se pasa a todos los agregadores, así que añadir una métrica
+    nueva no supone otra lectura del fichero.
+
+    El registro puede ser un fichero, un patrón glob o una lista de ellos
+    (por ejemplo los ficheros rotados `access.log*`), comprimidos o no; todos
+    se leen como un único flujo (`expand_logs`, `open_log`). Los ficheros se
+    leen en binario por bloques grandes y cada línea se analiza como con
+    `parse_bytes`, que tolera bytes que no son UTF-8, pero solo se decodifican
+    los campos que declaran los agregadores (`Aggregator.fields`).
+
+    Con `workers > 1` cada fichero sin comprimir se divide en rangos de bytes
+    alineados con los saltos de línea (`split_ranges`) y cada fichero
+    comprimido es una unidad de trabajo. Cada unidad se procesa en un proceso
+    distinto con una copia vacía de los agregadores y los resultados parciales
+    se combinan en orden con `merge`, así que coinciden con los de la pasada
+    en serie.
+
+    Con `cache` (una `AnalysisCache` o un directorio) el resultado de cada
+    fichero se guarda en disco y se reutiliza mientras el fichero no cambie;
+    si solo ha crecido, se procesa únicamente lo añadido.
+
+    Args:
+    filename (str | list[str]): la ruta, patrón o lista de rutas del registro.
+    aggregators (dict[str, Aggregator]): agregadores vacíos indexados por nombre.
+    workers (int): número de procesos; 1 procesa el fichero en serie.
+    cache (AnalysisCache | str | None): caché de resultados por fichero.
+
+    Returns:
+    dict: el resultado de cada agregador bajo el mismo nombre.
+
+    Examples
+    --------
+    >>> res = analyze('access_short.log', {'hist': HourHistogram(), 'status': StatusCodes(), 'bytes': BytesServed()})
+    >>> res['hist'], res['status'], res['bytes']
+    ({5: 3, 7: 2, 23: 1}, {200: 3, 404: 2, 302: 1}, 2908)
+
+    >>> analyze('access_short.log', {'hist': HourHistogram()}, workers=3)
+    {'hist': {5: 3, 7: 2, 23: 1}}
+
+    >>> analyze(['access_short.log', 'access_short.log'], {'hist': HourHistogram()})
+    {'hist': {5: 6, 7: 4, 23: 2}}
     '''
-    hist = {}
     try:
-        with open(filename) as f:
-            for line in f:
-                hour = get_hour(line)
-                hist[hour] = hist.get(hour, 0) + 1
+        paths = expand_logs(filename)
+        if cache is None:
+            _analyze_paths(paths, aggregators, workers)
+        else:
+            if not isinstance(cache, AnalysisCache):
+                cache = AnalysisCache(cache)
+            template = pickle.dumps(aggregators, pickle.HIGHEST_PROTOCOL)
+            for path in paths:
+                state = cache.analyze(path, template, workers)
+                for name, aggregator in aggregators.items():
+                    aggregator.merge(state[name])
     except Exception as e:
         print(f"Error al leer el archivo: {e}")
-    return hist
+    return {name: aggregator.result() for name, aggregator in aggregators.items()}
+
+
+def histbyhour(filename: str | list[str], workers: int = 1,
+               cache: 'AnalysisCache | str | None' = None) -> dict[int, int]:
+    '''
+    Genera un histórico de accesos por hora a partir de un registro.
+
+    Args:
+    filename (str | list[str]): la ruta del registro, un patrón glob o una lista de rutas; se aceptan ficheros comprimidos.
+    workers (int): número de procesos con los que repartir el fichero.
+    cache (AnalysisCache | str | None): caché de resultados por fichero.
+
+    Returns:
+    Dict[int, int]: Un diccionario con las horas únicas como claves y sus correspondientes cantidades de accesos como valores.
+    '''
+    return analyze(filename, {'hist': HourHistogram()}, workers, cache)['hist']
 
 
-def ipaddreses(filename: str) -> set[str]:
+def ipaddreses(filename: str | list[str], workers: int = 1,
+               cache: 'AnalysisCache | str | None' = None) -> set[str]:
     '''
     Devuelve las IPs de los accesos que no son bots.
 
     Args:
-    filename (str): la ruta del archivo de registro.
+    filename (str | list[str]): la ruta del registro, un patrón glob o una lista de rutas; se aceptan ficheros comprimidos.
+    workers (int): número de procesos con los que repartir el fichero.
+    cache (AnalysisCache | str | None): caché de resultados por fichero.
 
     Returns:
     Set[str]: un conjunto de direcciones IP.
     '''
-    ip_set = set()
+    return analyze(filename, {'ips': NonBotIPs()}, workers, cache)['ips']
+
+
+def count_ipaddreses(filename: str | list[str], precision: int | None = None,
+                     workers: int = 1, cache: 'AnalysisCache | str | None' = None) -> int:
+    '''
+    Cuenta las IPs distintas de los accesos que no son bots.
+
+    Sin `precision` el recuento es exacto (como `len(ipaddreses(...))`); con
+    ella se usa un `HyperLogLog` de 2**precision registros, cuya memoria no
+    crece con el número de IPs.
+
+    Args:
+    filename (str | list[str]): la ruta del registro, un patrón glob o una lista de rutas.
+    precision (int | None): precisión del sketch, entre 4 y 18; None para el recuento exacto.
+    workers (int): número de procesos con los que repartir el fichero.
+    cache (AnalysisCache | str | None): caché de resultados por fichero.
+
+    Returns:
+    int: el número (exacto o estimado) de IPs distintas.
+
+    Examples
+    --------
+    >>> count_ipaddreses('access_short.log'), count_ipaddreses('access_short.log', precision=12)
+    (2, 2)
+    '''
+    if precision is None:
+        return len(analyze(filename, {'ips': NonBotIPs()}, workers, cache)['ips'])
+    return analyze(filename, {'ips': NonBotIPCount(precision)}, workers, cache)['ips']
+
+
+def follow(filename: str, interval: float = 1.0, from_start: bool = False,
+           idle: int | None = None, binary: bool = False):
+    '''
+    Sigue un registro que se sigue escribiendo, como `tail -F`.
+
+    Devuelve las líneas completas a medida que aparecen. Si el fichero se
+    rota (se sustituye por otro con el mismo nombre) termina de leer el
+    antiguo y continúa desde el principio del nuevo; si se trunca, vuelve al
+    principio. Una línea a medio escribir se guarda hasta que llega su salto
+    de línea.
+
+    El fichero se lee en binario: las líneas se devuelven como bytes con
+    `binary=True` o decodificadas como UTF-8, sustituyendo los bytes no
+    válidos por '\\ufffd' en lugar de interrumpir el seguimiento.
+
+    Args:
+    filename (str): la ruta del archivo de registro.
+    interval (float): segundos de espera cuando no hay datos nuevos.
+    from_start (bool): leer el contenido ya existente en lugar de empezar al final.
+    idle (int | None): número de esperas seguidas sin datos tras las que se
+        termina; None para no terminar nunca.
+    binary (bool): devolver las líneas en bytes en lugar de texto.
+
+    Returns:
+    Iterator[str | bytes]: las líneas nuevas del registro.
+
+    Examples
+    --------
+    >>> lines = list(follow('access_short.log', interval=0, from_start=True, idle=1))
+    >>> len(lines), get_ipaddr(lines[-1])
+    (6, '66.249.66.135')
+    '''
+    f = open(filename, 'rb')
     try:
-        with open(filename) as f:
-            for line in f:
-                if not is_bot(line):
-                    ip_set.add(get_ipaddr(line))
-    except Exception as e:
-        print(f"Error al leer el archivo: {e}")
-    return ip_set
+        inode = os.fstat(f.fileno()).st_ino
+        if not from_start:
+            f.seek(0, os.SEEK_END)
+        pending = b''
+        waits = 0
+        while True:
+            line = f.readline()
+            if line:
+                pending += line
+                if pending.endswith(b'\n'):
+                    waits = 0
+                    yield pending if binary else pending.decode('utf-8', 'replace')
+                    pending = b''
+                continue
+            try:
+                st = os.stat(filename)
+            except FileNotFoundError:
+                st = None
+            if st is not None and st.st_ino != inode:
+                f.close()
+                f = open(filename, 'rb')
+                inode = os.fstat(f.fileno()).st_ino
+                pending = b''
+                continue
+            if st is not None and st.st_size < f.tell():
+                f.seek(0)
+                pending = b''
+                continue
+            if idle is not None and waits >= idle:
+                return
+            waits += 1
+            time.sleep(interval)
+    finally:
+        f.close()
+
+
+def watch(filename: str, aggregators: dict[str, Aggregator], **kwargs):
+    '''
+    Mantiene los agregadores al día con las líneas que se van escribiendo.
+
+    Cada línea nueva se analiza una vez (sobre sus bytes, con `parse_bytes`)
+    y actualiza los agregadores, sin volver a leer lo ya procesado; el
+    resultado de cualquiera de ellos se puede consultar con `result()` en
+    todo momento.
+
+    Args:
+    filename (str): la ruta del archivo de registro.
+    aggregators (dict[str, Aggregator]): agregadores indexados por nombre.
+    **kwargs: opciones de `follow` (interval, from_start, idle).
+
+    Returns:
+    Iterator[LogRecord]: el registro de cada línea nueva, ya contabilizado.
+
+    Examples
+    --------
+    >>> aggs = {'hist': HourHistogram(), 'ips': NonBotIPs()}
+    >>> for record in watch('access_short.log', aggs, interval=0, from_start=True, idle=1):
+    ...     pass
+    >>> aggs['hist'].result()
+    {5: 3, 7: 2, 23: 1}
+    '''
+    updates = [aggregator.update for aggregator in aggregators.values()]
+    for line in follow(filename, binary=True, **kwargs):
+        record = parse_bytes(line)
+        for update in updates:
+            update(record)
+        yield record
+
+
+_MONTHS = {name: i for i, name in enumerate(
+    ('Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec'), 1)}
+
+NO_TIMESTAMP = np.iinfo(np.int64).min
+
+
+@lru_cache(maxsize=4096)
+def _day_epoch(day: str) -> int:
+    return calendar.timegm((int(day[7:11]), _MONTHS[day[3:6]], int(day[0:2]), 0, 0, 0))
+
+
+def timestamp_epoch(timestamp: str) -> int:
+    '''
+    Convierte la fecha de una línea del registro en segundos desde 1970 (UTC).
+
+    Examples
+    --------
+    >>> timestamp_epoch('09/Oct/2023:05:22:57 +0200')
+    1696821777
+    >>> timestamp_epoch('09/Oct/2023:03:22:57 +0000')
+    1696821777
+    '''
+    tz = timestamp[21:26]
+    offset = int(tz[1:3]) * 3600 + int(tz[3:5]) * 60
+    return (_day_epoch(timestamp[:11]) + int(timestamp[12:14]) * 3600 + int(timestamp[15:17]) * 60
+            + int(timestamp[18:20]) - (offset if tz[0] == '+' else -offset))
+
+
+class LogTable:
+    """
+    Registro de accesos en formato columnar, para consultarlo muchas veces sin
+    volver a analizar el texto.
+
+    Cada columna es un array de NumPy con un tipo fijo:
+
+    - `ip` (uint32): la IPv4 como entero; 0 si la IP no es IPv4.
+    - `ip_other` (int32): índice en `ip_others` de las IPs que no son IPv4, -1 si lo es.
+    - `timestamp` (int64): segundos desde 1970 en UTC; `NO_TIMESTAMP` si falta.
+    - `hour` (int8): hora local del acceso, -1 si falta (como `get_hour`).
+    - `status` (uint16): código de estado, 0 si falta.
+    - `size` (int64): bytes servidos.
+    - `bot` (bool): si el agente de usuario es un bot.
+    - `user_agent` (int32): índice en el diccionario `user_agents`.
+
+    Las consultas son operaciones vectorizadas sobre las columnas.
+
+    Examples
+    --------
+    >>> table = LogTable.from_log('access_short.log')
+    >>> len(table), table.histbyhour(), table.ipaddreses() == ipaddreses('access_short.log')
+    (6, {5: 3, 7: 2, 23: 1}, True)
+    >>> table.status_codes(), table.bytes_served()
+    ({200: 3, 302: 1, 404: 2}, 2908)
+    >>> table.top_ips(1)
+    [('39.103.168.88', 3)]
+    """
+
+    COLUMNS = {'ip': np.uint32, 'ip_other': np.int32, 'timestamp': np.int64, 'hour': np.int8,
+               'status': np.uint16, 'size': np.int64, 'bot': np.bool_, 'user_agent': np.int32}
+
+    def __init__(self, columns: dict[str, np.ndarray], user_agents: np.ndarray, ip_others: np.ndarray):
+        """
+        Crea la tabla a partir de sus columnas y diccionarios.
+        """
+        self._columns = {name: np.asarray(columns[name], dtype=dtype)
+                         for name, dtype in self.COLUMNS.items()}
+        self._user_agents = np.asarray(user_agents, dtype=str)
+        self._ip_others = np.asarray(ip_others, dtype=str)
+
+    @classmethod
+    def from_log(cls, filename) -> 'LogTable':
+        """
+        Analiza el registro (una ruta, un patrón o una lista, como en
+        `analyze`) una sola vez y construye las columnas.
+        """
+        values = {name: array.array(code) for name, code in
+                  (('ip', 'L'), ('ip_other', 'l'), ('timestamp', 'q'), ('hour', 'b'),
+                   ('status', 'H'), ('size', 'q'), ('bot', 'B'), ('user_agent', 'l'))}
+        user_agents = {}
+        ip_others = {}
+        for path in expand_logs(filename):
+            for line in _read_range(path, 0, None):
+                record = parse_bytes(line)
+                packed = pack_ip(record.ip)
+                if isinstance(packed, int) and packed < 1 << 32:
+                    values['ip'].append(packed)
+                    values['ip_other'].append(-1)
+                else:
+                    values['ip'].append(0)
+                    values['ip_other'].append(ip_others.setdefault(record.ip, len(ip_others)))
+                try:
+                    values['timestamp'].append(timestamp_epoch(record.timestamp))
+                except (ValueError, KeyError):
+                    values['timestamp'].append(NO_TIMESTAMP)
+                values['hour'].append(record.hour)
+                values['status'].append(max(record.status, 0))
+                values['size'].append(record.size)
+                values['bot'].append(record.bot)
+                values['user_agent'].append(user_agents.setdefault(record.user_agent, len(user_agents)))
+        return cls({name: np.array(data) for name, data in values.items()},
+                   list(user_agents), list(ip_others))
+
+    def save(self, path: str) -> None:
+        """
+        Guarda la tabla. Si la ruta termina en `.parquet` se escribe un fichero
+        Parquet (necesita el paquete opcional `pyarrow`, y el agente de usuario
+        se guarda como columna de diccionario); en otro caso, un directorio con
+        un fichero `.npy` por columna que `load` abre sin copiarlo a memoria.
+        """
+        if path.endswith('.parquet'):
+            pa, pq = _import_pyarrow()
+            arrays = {name: pa.array(column) for name, column in self._columns.items()}
+            arrays['user_agent'] = pa.DictionaryArray.from_arrays(
+                pa.array(self._columns['user_agent']), pa.array(self._user_agents.tolist()))
+            arrays['ip_other'] = pa.DictionaryArray.from_arrays(
+                pa.array(self._columns['ip_other'], mask=self._columns['ip_other'] < 0),
+                pa.array(self._ip_others.tolist(), type=pa.string()))
+            pq.write_table(pa.table(arrays), path)
+            return
+        os.makedirs(path, exist_ok=True)
+        for name, column in self._columns.items():
+            np.save(os.path.join(path, f'{name}.npy'), column)
+        np.save(os.path.join(path, 'user_agents.npy'), self._user_agents)
+        np.save(os.path.join(path, 'ip_others.npy'), self._ip_others)
+
+    @classmethod
+    def load(cls, path: str) -> 'LogTable':
+        """
+        Carga una tabla guardada con `save`. Las columnas `.npy` se abren con
+        `np.load(mmap_mode='r')`, así que la carga es inmediata.
+        """
+        if path.endswith('.parquet'):
+            pa, pq = _import_pyarrow()
+            table = pq.read_table(path)
+            columns = {name: table.column(name).combine_chunks() for name in cls.COLUMNS}
+            user_agent, ip_other = columns['user_agent'], columns['ip_other']
+            columns['user_agent'] = user_agent.indices.to_numpy(zero_copy_only=False)
+            columns['ip_other'] = ip_other.indices.fill_null(-1).to_numpy(zero_copy_only=False)
+            columns = {name: np.asarray(column) for name, column in columns.items()}
+            return cls(columns, user_agent.dictionary.to_pylist(), ip_other.dictionary.to_pylist())
+        columns = {name: np.load(os.path.join(path, f'{name}.npy'), mmap_mode='r')
+                   for name in cls.COLUMNS}
+        return cls(columns, np.load(os.path.join(path, 'user_agents.npy')),
+                   np.load(os.path.join(path, 'ip_others.npy')))
+
+    def __len__(self) -> int:
+        return len(self._columns['ip'])
+
+    def column(self, name: str) -> np.ndarray:
+        """
+        Obtiene una columna por su nombre.
+        """
+        return self._columns[name]
+
+    @property
+    def user_agents(self) -> np.ndarray:
+        """
+        Obtiene el diccionario de agentes de usuario.
+        """
+        return self._user_agents
+
+    def _ip_strings(self, mask: np.ndarray) -> list[str]:
+        ips = self._columns['ip'][mask]
+        other = self._columns['ip_other'][mask]
+        v4 = np.unique(ips[other < 0])
+        return ([str(ipaddress.IPv4Address(int(ip))) for ip in v4]
+                + self._ip_others[np.unique(other[other >= 0])].tolist())
+
+    def histbyhour(self) -> dict[int, int]:
+        """
+        Igual que `histbyhour`: número de accesos por hora local.
+        """
+        hours, counts = np.unique(self._columns['hour'], return_counts=True)
+        return dict(zip(hours.tolist(), counts.tolist()))
+
+    def ipaddreses(self) -> set[str]:
+        """
+        Igual que `ipaddreses`: IPs de los accesos que no son bots.
+        """
+        return set(self._ip_strings(~self._columns['bot']))
+
+    def status_codes(self) -> dict[int, int]:
+        """
+        Número de respuestas por código de estado (0 si no se encuentra).
+        """
+        codes, counts = np.unique(self._columns['status'], return_counts=True)
+        return dict(zip(codes.tolist(), counts.tolist()))
+
+    def bytes_served(self) -> int:
+        """
+        Total de bytes servidos.
+        """
+        return int(self._columns['size'].sum())
+
+    def top_ips(self, n: int = 10) -> list[tuple[str, int]]:
+        """
+        Las `n` IPs con más accesos y su número de accesos.
+        """
+        keys = self._columns['ip'].astype(np.int64)
+        other = self._columns['ip_other']
+        keys[other >= 0] = -1 - other[other >= 0]
+        unique, counts = np.unique(keys, return_counts=True)
+        order = np.argsort(-counts, kind='stable')[:n]
+        return [(str(ipaddress.IPv4Address(int(key))) if key >= 0 else str(self._ip_others[-1 - key]),
+                 int(count)) for key, count in zip(unique[order], counts[order])]
+
+    def between(self, start: int, end: int) -> np.ndarray:
+        """
+        Máscara de los accesos con `start <= timestamp < end` (segundos UTC).
+        """
+        timestamp = self._columns['timestamp']
+        return (timestamp >= start) & (timestamp < end)
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ModuleNotFoundError:
+        raise ModuleNotFoundError("se necesita el paquete pyarrow para leer o escribir Parquet")
+    return pyarrow, pyarrow.parquet
+
+
+def ingest(filename, output: str) -> LogTable:
+    '''
+    Analiza el registro una vez y lo guarda en formato columnar (`LogTable`)
+    en `output`: un directorio de ficheros `.npy` o un fichero `.parquet`.
+
+    Desde la línea de órdenes: `python sketch.py ingest access.log salida/`.
+
+    Args:
+    filename (str | list[str]): la ruta, patrón o lista de rutas del registro.
+    output (str): directorio o fichero `.parquet` de salida.
+
+    Returns:
+    LogTable: la tabla construida.
+
+    Examples
+    --------
+    >>> import tempfile
+    >>> with tempfile.TemporaryDirectory() as tmp:
+    ...     _ = ingest('access.log', tmp)
+    ...     table = LogTable.load(tmp)
+    ...     table.histbyhour() == histbyhour('access.log'), table.ipaddreses() == ipaddreses('access.log')
+    (True, True)
+    '''
+    table = LogTable.from_log(filename)
+    table.save(output)
+    return table
+
+
+def benchmark_parsers(filename: str = 'access.log', repeat: int = 2000) -> dict[str, float]:
+    '''
+    Compara el coste por línea de las funciones auxiliares (`get_ipaddr`,
+    `get_hour` e `is_bot`, cada una con su propia búsqueda) con el de
+    `parse_line`, que extrae todos los campos en un solo recorrido.
+
+    Las líneas del fichero se leen una vez y se repiten `repeat` veces en
+    memoria para que la medida no dependa del disco.
+
+    Args:
+    filename (str): la ruta del archivo de registro.
+    repeat (int): número de veces que se repite el contenido del fichero.
+
+    Returns:
+    dict[str, float]: microsegundos por línea de cada método y la mejora.
+    '''
+    with open(filename) as f:
+        lines = f.readlines() * repeat
+
+    def helpers():
+        for line in lines:
+            get_ipaddr(line)
+            get_hour(line)
+            is_bot(line)
+
+    def parser():
+        for line in lines:
+            parse_line(line)
+
+    result = {}
+    for name, func in (('helpers', helpers), ('parse_line', parser)):
+        result[name] = min(timeit.repeat(func, number=1, repeat=3)) / len(lines) * 1e6
+        print(f"{name:>12}: {result[name]:.3f} µs/línea")
+    result['speedup'] = result['helpers'] / result['parse_line']
+    print(f"{'mejora':>12}: x{result['speedup']:.2f} ({len(lines)} líneas)")
+    return result
 
 
 def main():
@@ -135,6 +1683,36 @@ def main():
     # Prueba de la función histbyhour
     test_hist()
 
+    # Prueba del análisis en una sola pasada
+    test_analyze()
+
+    # Prueba del análisis en paralelo por rangos del fichero
+    test_parallel()
+
+    # Prueba del seguimiento de un registro que rota y se trunca
+    test_follow()
+
+    # Prueba de las firmas de bots configurables
+    test_bot_signatures()
+
+    # Prueba del analizador de líneas frente a las funciones auxiliares
+    test_parse_line()
+
+    # Prueba de la lectura de registros rotados y comprimidos
+    test_compressed()
+
+    # Prueba de la lectura en binario con bytes no válidos
+    test_binary()
+
+    # Prueba del recuento aproximado de IPs
+    test_count_ips()
+
+    # Prueba de la caché de resultados por fichero
+    test_cache()
+
+    # Prueba de la exportación columnar
+    test_columnar()
+
     print("Todas las pruebas se han ejecutado correctamente.")
 
 
@@ -143,6 +1721,38 @@ def test_doc():
     doctest.run_docstring_examples(is_bot, globals(), verbose=True)
     doctest.run_docstring_examples(get_ipaddr, globals(), verbose=True)
     doctest.run_docstring_examples(get_hour, globals(), verbose=True)
+    doctest.run_docstring_examples(_signature_pattern, globals(), verbose=True)
+    doctest.run_docstring_examples(BotMatcher, globals(), verbose=True)
+    doctest.run_docstring_examples(BotMatcher.from_file, globals(), verbose=True)
+    doctest.run_docstring_examples(is_bot_agent, globals(), verbose=True)
+    doctest.run_docstring_examples(parse_line, globals(), verbose=True)
+    doctest.run_docstring_examples(parse_bytes, globals(), verbose=True)
+    doctest.run_docstring_examples(_bytes_parser, globals(), verbose=True)
+    doctest.run_docstring_examples(Aggregator, globals(), verbose=True)
+    doctest.run_docstring_examples(HourHistogram, globals(), verbose=True)
+    doctest.run_docstring_examples(NonBotIPs, globals(), verbose=True)
+    doctest.run_docstring_examples(StatusCodes, globals(), verbose=True)
+    doctest.run_docstring_examples(BytesServed, globals(), verbose=True)
+    doctest.run_docstring_examples(MalformedLines, globals(), verbose=True)
+    doctest.run_docstring_examples(split_ranges, globals(), verbose=True)
+    doctest.run_docstring_examples(compression, globals(), verbose=True)
+    doctest.run_docstring_examples(open_log, globals(), verbose=True)
+    doctest.run_docstring_examples(_rotation_key, globals(), verbose=True)
+    doctest.run_docstring_examples(expand_logs, globals(), verbose=True)
+    doctest.run_docstring_examples(_byte_lines, globals(), verbose=True)
+    doctest.run_docstring_examples(pack_ip, globals(), verbose=True)
+    doctest.run_docstring_examples(unpack_ip, globals(), verbose=True)
+    doctest.run_docstring_examples(HyperLogLog, globals(), verbose=True)
+    doctest.run_docstring_examples(NonBotIPCount, globals(), verbose=True)
+    doctest.run_docstring_examples(fingerprint, globals(), verbose=True)
+    doctest.run_docstring_examples(AnalysisCache, globals(), verbose=True)
+    doctest.run_docstring_examples(analyze, globals(), verbose=True)
+    doctest.run_docstring_examples(count_ipaddreses, globals(), verbose=True)
+    doctest.run_docstring_examples(follow, globals(), verbose=True)
+    doctest.run_docstring_examples(watch, globals(), verbose=True)
+    doctest.run_docstring_examples(timestamp_epoch, globals(), verbose=True)
+    doctest.run_docstring_examples(LogTable, globals(), verbose=True)
+    doctest.run_docstring_examples(ingest, globals(), verbose=True)
 
 def test_ipaddresses():
     assert ipaddreses('access_short.log') == {'34.105.93.183', '39.103.168.88'}
@@ -151,5 +1761,179 @@ def test_hist():
     hist = histbyhour('access_short.log')
     assert hist == {5: 3, 7: 2, 23: 1}
 
+def test_analyze():
+    res = analyze('access.log', {'hist': HourHistogram(), 'ips': NonBotIPs()})
+    assert res['hist'] == histbyhour('access.log')
+    assert res['ips'] == ipaddreses('access.log')
+
+def test_parallel():
+    for workers in (2, 3, 8):
+        assert histbyhour('access.log', workers) == histbyhour('access.log')
+        assert ipaddreses('access.log', workers) == ipaddreses('access.log')
+
+def test_follow():
+    import tempfile
+    with open('access_short.log') as f:
+        lines = f.readlines()
+    with tempfile.TemporaryDirectory() as tmp:
+        log = os.path.join(tmp, 'access.log')
+        with open(log, 'w') as f:
+            f.write(lines[0])
+        aggs = {'hist': HourHistogram(), 'ips': NonBotIPs()}
+        events = watch(log, aggs, interval=0, from_start=True, idle=1)
+        next(events)
+        with open(log, 'a') as f:
+            f.write(lines[1] + lines[2][:10])
+        next(events)
+        with open(log, 'a') as f:
+            f.write(lines[2][10:])
+        next(events)
+        os.rename(log, log + '.1')
+        with open(log, 'w') as f:
+            f.write(lines[3] + lines[4])
+        next(events)
+        next(events)
+        with open(log, 'w') as f:
+            f.write(lines[5])
+        assert len(list(events)) == 1
+        assert aggs['hist'].result() == {5: 3, 7: 2, 23: 1}
+        assert aggs['ips'].result() == {'34.105.93.183', '39.103.168.88'}
+        with open(log, 'ab') as f:
+            f.write(lines[2].replace('GET / ', 'GET /\xe9 ').encode('latin-1') + b'\xff\xfe\n')
+        records = list(watch(log, aggs, interval=0, from_start=True, idle=1))
+        assert [record.malformed for record in records] == [False, False, True]
+        assert list(follow(log, interval=0, from_start=True, idle=1))[-1] == '\ufffd\ufffd\n'
+
+def test_bot_signatures():
+    from multiprocessing import get_context
+    use_bot_signatures('bots.txt')
+    try:
+        assert is_bot_agent('python-requests/2.25.1')
+        assert ipaddreses('access_short.log') == {'34.105.93.183', '39.103.168.88'}
+        aggs = {'ips': NonBotIPs()}
+        _analyze_paths(['access.log'], aggs, 3, get_context('spawn'))
+        assert aggs['ips'].result() == ipaddreses('access.log')
+    finally:
+        use_bot_signatures()
+    assert not is_bot_agent('python-requests/2.25.1')
+
+def test_parse_line():
+    with open('access.log') as f:
+        for line in f:
+            record = parse_line(line, strict=True)
+            assert record.ip == get_ipaddr(line)
+            assert record.hour == get_hour(line)
+            assert record.user_agent == get_user_agent(line)
+            assert record.bot == is_bot(line)
+    assert analyze('access.log', {'malformed': MalformedLines()}) == {'malformed': 0}
+    record = parse_line(r'1.2.3.4 - - [09/Oct/2023:05:22:57 +0200] "GET /a\"b HTTP/1.1" 200 336 "-" "Agente \"bot\""', strict=True)
+    assert (record.request, record.user_agent, record.bot) == (r'GET /a\"b HTTP/1.1', r'Agente \"bot\"', True)
+    assert parse_bytes(rb'1.2.3.4 - - [09/Oct/2023:05:22:57 +0200] "GET /a\"b HTTP/1.1" 200 336 "-" "-"').request == r'GET /a\"b HTTP/1.1'
+    # Con solo los campos que piden los agregadores el resultado no cambia.
+    def everything():
+        return {'hist': HourHistogram(), 'ips': NonBotIPs(), 'status': StatusCodes(),
+                'bytes': BytesServed(), 'malformed': MalformedLines()}
+    with open('access.log', 'rb') as f:
+        lines = f.readlines() + [b'l\xednea rota\n']
+    for name, aggregator in everything().items():
+        full = everything()[name]
+        _feed(lines, {name: aggregator})
+        _feed(lines, {name: full}, parse=parse_bytes)
+        assert aggregator.result() == full.result(), name
+
+def test_compressed():
+    import tempfile
+    with open('access.log', 'rb') as f:
+        data = f.read()
+    with tempfile.TemporaryDirectory() as tmp:
+        log = os.path.join(tmp, 'access.log')
+        with open(log, 'wb') as f:
+            f.write(data)
+        for i, (module, ext) in enumerate(((gzip, 'gz'), (bz2, 'bz2'), (lzma, 'xz')), 1):
+            with module.open(f'{log}.{i}.{ext}', 'wb') as f:
+                f.write(data)
+        assert [compression(path) for path in expand_logs(log + '*')] == ['xz', 'bz2', 'gzip', None]
+        hist = histbyhour(log + '*')
+        assert hist == {hour: 4 * count for hour, count in histbyhour('access.log').items()}
+        assert histbyhour(log + '*', workers=3) == hist
+        assert ipaddreses(log + '*', workers=3) == ipaddreses('access.log')
+
+def test_binary():
+    import tempfile
+    with open('access_short.log', 'rb') as f:
+        data = f.read()
+    with tempfile.TemporaryDirectory() as tmp:
+        log = os.path.join(tmp, 'access.log')
+        with open(log, 'wb') as f:
+            f.write(data.replace(b'GET / ', b'GET /\xe9\xff ') + b'\xff\xfe\r\n')
+        assert histbyhour(log) == {5: 3, 7: 2, 23: 1, -1: 1}
+        assert ipaddreses(log) == {'34.105.93.183', '39.103.168.88', '\ufffd\ufffd'}
+
+def test_count_ips():
+    exact = count_ipaddreses('access.log')
+    assert exact == len(ipaddreses('access.log'))
+    assert count_ipaddreses('access.log', precision=14) == exact
+    assert count_ipaddreses('access.log', precision=14, workers=3) == exact
+
+def test_cache():
+    import tempfile
+    with open('access.log', 'rb') as f:
+        lines = f.readlines()
+    with tempfile.TemporaryDirectory() as tmp:
+        log = os.path.join(tmp, 'access.log')
+        cache = AnalysisCache(os.path.join(tmp, 'cache'))
+        with open(log, 'wb') as f:
+            f.writelines(lines[:20])
+        histbyhour(log, cache=cache)
+        assert (cache.misses, cache.hits, cache.appends) == (1, 0, 0)
+        histbyhour(log, cache=cache)
+        assert (cache.misses, cache.hits, cache.appends) == (1, 1, 0)
+        with open(log, 'ab') as f:
+            f.writelines(lines[20:])
+        assert histbyhour(log, cache=cache) == histbyhour('access.log')
+        assert (cache.misses, cache.hits, cache.appends) == (1, 1, 1)
+        with open(log, 'wb') as f:
+            f.writelines(lines[1:])
+        assert ipaddreses(log, cache=cache) == ipaddreses('access.log')
+        assert histbyhour(log, cache=cache) == histbyhour(log)
+        assert cache.misses == 3
+        # Lo que se añade justo después de medir el fichero no se cuenta dos
+        # veces, tampoco al repartirlo entre procesos.
+        with open(log, 'wb') as f:
+            f.writelines(lines[:20])
+        grow = AnalysisCache(os.path.join(tmp, 'grow'))
+
+        def load_and_grow(entry_path):
+            with open(log, 'ab') as f:
+                f.writelines(lines[20:30])
+            return None
+        grow._load = load_and_grow
+        histbyhour(log, workers=2, cache=grow)
+        del grow._load
+        expected = os.path.join(tmp, 'expected.log')
+        with open(expected, 'wb') as f:
+            f.writelines(lines[:30])
+        assert histbyhour(log, workers=2, cache=grow) == histbyhour(expected)
+        assert (grow.misses, grow.appends) == (1, 1)
+
+def test_columnar():
+    import tempfile
+    table = LogTable.from_log('access.log')
+    assert len(table) == 48
+    assert table.histbyhour() == histbyhour('access.log')
+    assert table.ipaddreses() == ipaddreses('access.log')
+    res = analyze('access.log', {'status': StatusCodes(), 'bytes': BytesServed()})
+    assert table.status_codes() == res['status'] and table.bytes_served() == res['bytes']
+    with tempfile.TemporaryDirectory() as tmp:
+        table.save(tmp)
+        loaded = LogTable.load(tmp)
+        assert all((loaded.column(name) == table.column(name)).all() for name in LogTable.COLUMNS)
+        assert loaded.top_ips(3) == table.top_ips(3)
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    if sys.argv[1:] == ['bench']:
+        benchmark_parsers()
+    elif sys.argv[1:2] == ['ingest'] and len(sys.argv) == 4:
+        print(f"{len(ingest(sys.argv[2], sys.argv[3]))} líneas guardadas en {sys.argv[3]}")
+    else:
+        main()
\ No newline at end of file
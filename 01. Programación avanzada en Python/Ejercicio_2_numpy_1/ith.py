@@ -1,12 +1,89 @@
 # imports
 
+import ast
+import hashlib
+import os
+from typing import NamedTuple
+
 import numpy as np
 
+try:
+    import numexpr
+except ModuleNotFoundError:
+    numexpr = None
+
+# cells per block in the blocked functions (small enough to stay in cache)
+BLOCK_SIZE = 1 << 14
+
+
+def _cache_path(fname: str, dtype: type, cache_dir: str) -> str:
+    """
+    Path in `cache_dir` of the `.npy` copy of a text grid: the name depends
+    on the absolute path of the text and on the dtype, so grids with the
+    same name or read with another dtype do not share a copy.
+    """
+    source = os.path.abspath(fname)
+    key = hashlib.sha1(source.encode()).hexdigest()[:12]
+    stem = os.path.splitext(os.path.basename(source))[0]
+    return os.path.join(cache_dir, f'{stem}-{key}.{np.dtype(dtype).name}.npy')
+
 
-def summary(a: np.ndarray) -> tuple[float, float, float, float]:
+def read_grid(fname: str, dtype: type = np.float64, cache_dir: str | None = None) -> np.ndarray:
+    """
+    Reads a sensor grid. Binary `.npy` grids are memory-mapped (zero-copy).
+    A space-separated text grid is parsed with np.loadtxt; with `cache_dir`
+    it is converted once to a `.npy` in that directory (one per dtype),
+    which is memory-mapped while it is newer than the text. Nothing is
+    written next to the grid, and a cache that cannot be written is skipped.
+    :param fname: str
+        path of the `.npy` or text grid
+    :param dtype: type
+        data type of the grid
+    :param cache_dir: str | None
+        directory for the `.npy` copies of text grids; None not to cache them
+    :return: np.ndarray
+        the grid, as a read-only np.memmap when it comes from a `.npy`
+    >>> import tempfile
+    >>> with tempfile.TemporaryDirectory() as tmp:
+    ...     single = read_grid('datos/temperaturas.txt', np.float32, cache_dir=tmp)
+    ...     grid = read_grid('datos/temperaturas.txt', cache_dir=tmp)
+    ...     exact = np.array_equal(grid, np.loadtxt('datos/temperaturas.txt'), equal_nan=True)
+    ...     type(grid).__name__, grid.dtype, single.dtype, exact, len(os.listdir(tmp))
+    ...     del single, grid
+    ('memmap', dtype('float64'), dtype('float32'), True, 2)
+    >>> type(read_grid('datos/temperaturas.txt')).__name__
+    'ndarray'
+    """
+    if fname.endswith('.npy'):
+        grid = np.load(fname, mmap_mode='r')
+        return grid if grid.dtype == dtype else grid.astype(dtype)
+    if cache_dir is None:
+        return np.loadtxt(fname, dtype=dtype)
+    binary = _cache_path(fname, dtype, cache_dir)
+    if os.path.exists(binary) and os.path.getmtime(binary) >= os.path.getmtime(fname):
+        grid = np.load(binary, mmap_mode='r')
+        if grid.dtype == dtype:
+            return grid
+    grid = np.loadtxt(fname, dtype=dtype)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        # written aside and renamed, so readers never see a partial copy
+        partial = f'{binary}.{os.getpid()}.tmp'
+        with open(partial, 'wb') as f:
+            np.save(f, grid)
+        os.replace(partial, binary)
+    except OSError:
+        return grid
+    return np.load(binary, mmap_mode='r')
+
+
+def summary(a: np.ndarray, block: int = BLOCK_SIZE) -> tuple[float, float, float, float]:
     """
     function that returns the minimum, maximum, mean and standard deviation of an array
+    (ignoring nan), computed in a single pass with `summary_stats`
     :param a: ndarray
+    :param block: int
+        cells of each block
     :return: tuple of float
        a tuple of four float values: min, max, mean, std
     Examples
@@ -24,12 +101,38 @@ def summary(a: np.ndarray) -> tuple[float, float, float, float]:
     if a.size == 0:
         raise ValueError("El array está vacío")
 
-    return np.nanmin(a), np.nanmax(a), np.nanmean(a), np.nanstd(a)
+    return summary_stats(a, block).result()
+
 
-def check_nulls(a: np.ndarray) -> bool:
+def summary_stats(a: np.ndarray, block: int = BLOCK_SIZE) -> 'RunningSummary':
+    """
+    Minimum, maximum, mean, standard deviation and number of nan of an array
+    in a single pass: the array is walked in blocks of `block` cells and all
+    the statistics of each block are computed while it is in cache.
+    :param a: np.ndarray
+    :param block: int
+        cells of each block
+    :return: RunningSummary
+        the statistics (`result()`, `count`, `nans`)
+    >>> stats = summary_stats(np.array([[1, np.nan, 3], [4, 5, np.nan]]), block=4)
+    >>> stats.result(), stats.count, stats.nans
+    ((1.0, 5.0, 3.25, 1.479019945774904), 4, 2)
+    """
+    stats = RunningSummary()
+    flat = a.reshape(-1)
+    for start in range(0, flat.size, block):
+        stats.update(flat[start:start + block])
+    return stats
+
+
+def check_nulls(a: np.ndarray, block: int = BLOCK_SIZE) -> bool:
     """
     function that checks the validity od sensor data
+    The array is scanned in blocks of `block` cells and the scan stops at the
+    first block with a nan, without building a mask of the whole array.
     :param a: np.ndarray
+    :param block: int
+        cells of each block
     :return: bool
        indicates if data contains nan
     Examples
@@ -41,7 +144,15 @@ def check_nulls(a: np.ndarray) -> bool:
     >>> check_nulls(np.array([]))   # array vacío
     True
     """
-    return not np.isnan(a).any()
+    if a.dtype.kind not in 'fc':
+        return True   # only float and complex arrays can hold nan
+    flat = a.reshape(-1)
+    mask = np.empty(min(block, flat.size), dtype=bool)
+    for start in range(0, flat.size, block):
+        chunk = flat[start:start + block]
+        if np.isnan(chunk, out=mask[:chunk.size]).any():
+            return False
+    return True
 
 
 def ith(temperature: np.ndarray, humidity: np.ndarray) -> np.ndarray:
@@ -97,6 +208,607 @@ def isStress(ith: np.ndarray) -> np.ndarray:
     return ith > 78
 
 
+def ith_fused(temperature: np.ndarray, humidity: np.ndarray, out: np.ndarray | None = None,
+              dtype: type = np.float64, stress: bool = False, block: int = BLOCK_SIZE,
+              mask_out: np.ndarray | None = None, scratch: tuple[np.ndarray, np.ndarray] | None = None):
+    """
+    Calculates the same THI as `ith` without full-size temporaries. The grids
+    are walked in blocks of `block` cells; the intermediate results of each
+    block live in two small scratch buffers that stay in cache, so the inputs
+    are read once and the result written once. With `stress=True` the
+    `isStress` mask is computed from each block while it is still in cache.
+    With float64 the result is identical to `ith`; float32 halves the memory
+    traffic at the cost of float32 rounding.
+    Callers that run it repeatedly can pass `out`, `mask_out` and `scratch`
+    so that no array is allocated at all.
+    :param temperature:  np.ndarray
+        temperatures collected by the sensor in a grid
+    :param humidity:  np.ndarray
+        humidity data collected by the sensor on a grid
+    :param out: np.ndarray
+        optional C-contiguous array of the grid shape where the THI is written
+        (it may be one of the inputs, to compute in place)
+    :param dtype: type
+        data type of the result when `out` is not given
+    :param stress: bool
+        return also the `isStress` mask
+    :param block: int
+        cells of each block
+    :param mask_out: np.ndarray
+        optional C-contiguous bool array of the grid shape where the stress
+        mask is written (implies `stress=True`)
+    :param scratch: tuple of np.ndarray
+        optional pair of 1-d buffers of the result dtype with at least
+        min(block, cells) elements for the intermediate results
+    :return: np.ndarray or tuple of np.ndarray
+        the THI, or the THI and the stress mask
+    :raise ValueError: if shapes of the arrays are not the same, or an
+        output or scratch buffer does not fit
+    >>> t, h = np.array([[1., np.nan, 3.], [40., 5., 6.]]), np.array([[1., 2., 3.], [40., 5., 6.]])
+    >>> ith_fused(t, h, stress=True)
+    (array([[48., nan, 50.],
+           [97., 52., 53.]]), array([[False, False, False],
+           [ True, False, False]]))
+    >>> out = np.empty((2, 3), dtype=np.float32)
+    >>> ith_fused(t, h, out=out) is out, out.dtype
+    (True, dtype('float32'))
+    >>> mask, scratch = np.empty((2, 3), dtype=bool), (np.empty(4, np.float32), np.empty(4, np.float32))
+    >>> ith_fused(t, h, out=out, mask_out=mask, scratch=scratch, block=4)[1] is mask, int(mask.sum())
+    (True, 1)
+    >>> temperature, humidity = np.loadtxt('datos/temperaturas.txt'), np.loadtxt('datos/humedad.txt')
+    >>> np.array_equal(ith_fused(temperature, humidity, block=1000), ith(temperature, humidity), equal_nan=True)
+    True
+    """
+    if temperature.shape != humidity.shape:
+        raise ValueError(f"Shape of data sensors must be the same. Temperature: {temperature.shape} "
+                         f"!= humidity: {humidity.shape}")
+    if out is None:
+        out = np.empty(temperature.shape, dtype=dtype)
+    elif out.shape != temperature.shape or not out.flags.c_contiguous:
+        raise ValueError(f"out must be a C-contiguous array of shape {temperature.shape}")
+    stress = stress or mask_out is not None
+    if mask_out is None:
+        mask = np.empty(temperature.shape, dtype=bool) if stress else None
+    elif mask_out.shape != temperature.shape or mask_out.dtype != bool or not mask_out.flags.c_contiguous:
+        raise ValueError(f"mask_out must be a C-contiguous bool array of shape {temperature.shape}")
+    else:
+        mask = mask_out
+    t, h, o = temperature.reshape(-1), humidity.reshape(-1), out.reshape(-1)
+    m = mask.reshape(-1) if stress else None
+    cells = min(block, o.size)
+    if scratch is None:
+        first, second = np.empty(cells, dtype=out.dtype), np.empty(cells, dtype=out.dtype)
+    elif any(buffer.ndim != 1 or buffer.size < cells or buffer.dtype != out.dtype for buffer in scratch):
+        raise ValueError(f"scratch must be two 1-d {out.dtype} arrays of at least {cells} elements")
+    else:
+        first, second = scratch
+    for start in range(0, o.size, block):
+        stop = min(start + block, o.size)
+        a, b = first[:stop - start], second[:stop - start]
+        np.divide(h[start:stop], 100, out=a, casting='same_kind')
+        np.subtract(t[start:stop], 14.3, out=b, casting='same_kind')
+        np.multiply(a, b, out=a)
+        np.add(t[start:stop], 0.8, out=b, casting='same_kind')
+        np.add(b, a, out=a)
+        np.add(a, 46.4, out=a, casting='same_kind')
+        np.around(a, out=o[start:stop])
+        if stress:
+            np.greater(o[start:stop], 78, out=m[start:stop])
+    return (out, mask) if stress else out
+
+
+class RunningSummary:
+    """
+    Minimum, maximum, mean and standard deviation of data given in blocks,
+    ignoring NaN (like `summary`) but counting them. Each block is reduced
+    while it is in cache and merged into the running values with the
+    parallel form of Welford's algorithm (Chan et al.), so the std does not
+    lose precision subtracting large sums of squares.
+    >>> s = RunningSummary()
+    >>> s.update(np.array([1., 2., np.nan]))
+    >>> s.update(np.array([4., 5., 6.]))
+    >>> s.count, s.nans, s.result()
+    (5, 1, (1.0, 6.0, 3.6, 1.8547236990991407))
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.nans = 0
+        self.min = np.nan
+        self.max = np.nan
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def update(self, block: np.ndarray) -> None:
+        """
+        Adds a block of data.
+        :param block: np.ndarray
+            values of the block (any shape)
+        """
+        nan = np.isnan(block)
+        nans = int(np.count_nonzero(nan))
+        values = block[~nan] if nans else block.reshape(-1)
+        self.nans += nans
+        if values.size == 0:
+            return
+        other = RunningSummary()
+        other.count = values.size
+        other.min, other.max = values.min().item(), values.max().item()
+        other.mean = float(values.mean(dtype=np.float64))
+        deviation = values - other.mean
+        other.m2 = float(np.dot(deviation, deviation))
+        self.merge(other)
+
+    def merge(self, other: 'RunningSummary') -> None:
+        """
+        Adds the data summarized in another `RunningSummary`.
+        """
+        self.nans += other.nans
+        if other.count == 0:
+            return
+        if self.count == 0:
+            self.count, self.min, self.max, self.mean, self.m2 = \
+                other.count, other.min, other.max, other.mean, other.m2
+            return
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta * delta * self.count * other.count / count
+        self.min, self.max = min(self.min, other.min), max(self.max, other.max)
+        self.count = count
+
+    def result(self) -> tuple[float, float, float, float]:
+        """
+        :return: tuple of float
+           min, max, mean, std of the valid values (NaN if there are none)
+        """
+        if self.count == 0:
+            return np.nan, np.nan, np.nan, np.nan
+        return self.min, self.max, self.mean, float(np.sqrt(self.m2 / self.count))
+
+
+class THIReport(NamedTuple):
+    """
+    Result of `ith_blocked`.
+    """
+    ith: np.ndarray | None
+    stress: np.ndarray | None
+    stress_cells: int
+    summary: RunningSummary
+
+    @property
+    def valid(self) -> bool:
+        """
+        True if no cell has missing data (like `check_nulls`).
+        """
+        return self.summary.nans == 0
+
+
+def ith_blocked(temperature: np.ndarray, humidity: np.ndarray, out: np.ndarray | None = None,
+                stress_out: np.ndarray | None = None, block: int = BLOCK_SIZE) -> THIReport:
+    """
+    Evaluates the THI, the stress mask, the missing data check and the
+    summary of the THI in a single pass over the grids, walking them in
+    blocks of `block` cells that fit in cache. Only one block of each input
+    is in memory at a time, so memory-mapped grids (`read_grid`) much larger
+    than RAM can be processed; the THI and the stress mask are written to
+    `out` and `stress_out` (for instance `np.lib.format.open_memmap` files)
+    or, if they are not given, only summarized.
+    :param temperature:  np.ndarray
+        temperatures collected by the sensor in a grid
+    :param humidity:  np.ndarray
+        humidity data collected by the sensor on a grid
+    :param out: np.ndarray
+        optional C-contiguous float array of the grid shape for the THI
+    :param stress_out: np.ndarray
+        optional C-contiguous bool array of the grid shape for the stress mask
+    :param block: int
+        cells of each block
+    :return: THIReport
+        the outputs, the number of cells in stress and the `RunningSummary`
+        of the THI (NaN cells are those with missing data)
+    :raise ValueError: if shapes of the arrays are not the same
+    >>> temperature, humidity = np.loadtxt('datos/temperaturas.txt'), np.loadtxt('datos/humedad.txt')
+    >>> report = ith_blocked(temperature, humidity, out=np.empty(temperature.shape), block=1000)
+    >>> np.array_equal(report.ith, ith(temperature, humidity), equal_nan=True), report.stress
+    (True, None)
+    >>> report.valid == check_nulls(ith(temperature, humidity))
+    True
+    >>> report.stress_cells == int(isStress(ith(temperature, humidity)).sum())
+    True
+    >>> np.allclose(report.summary.result(), summary(ith(temperature, humidity)))
+    True
+    """
+    if temperature.shape != humidity.shape:
+        raise ValueError(f"Shape of data sensors must be the same. Temperature: {temperature.shape} "
+                         f"!= humidity: {humidity.shape}")
+    for name, array in (('out', out), ('stress_out', stress_out)):
+        if array is not None and (array.shape != temperature.shape or not array.flags.c_contiguous):
+            raise ValueError(f"{name} must be a C-contiguous array of shape {temperature.shape}")
+    t, h = temperature.reshape(-1), humidity.reshape(-1)
+    o = out.reshape(-1) if out is not None else None
+    s = stress_out.reshape(-1) if stress_out is not None else None
+    buffer = np.empty(min(block, t.size), dtype=out.dtype if out is not None else np.float64)
+    scratch = (np.empty_like(buffer), np.empty_like(buffer))
+    mask = np.empty(buffer.shape, dtype=bool)
+    stats = RunningSummary()
+    stress_cells = 0
+    for start in range(0, t.size, block):
+        stop = min(start + block, t.size)
+        thi = o[start:stop] if o is not None else buffer[:stop - start]
+        ith_fused(t[start:stop], h[start:stop], out=thi, block=block, scratch=scratch)
+        stressed = s[start:stop] if s is not None else mask[:stop - start]
+        np.greater(thi, 78, out=stressed)
+        stress_cells += int(np.count_nonzero(stressed))
+        stats.update(thi)
+    return THIReport(out, stress_out, stress_cells, stats)
+
+
+class SensorIndex(NamedTuple):
+    """
+    An index registered with `register_index`.
+    """
+    expression: str
+    inputs: tuple[str, ...]
+    rounded: bool
+
+
+# functions that index formulas can use (numexpr knows them by the same names)
+_FORMULA_FUNCTIONS = {'log': np.log, 'exp': np.exp, 'sqrt': np.sqrt, 'abs': np.abs, 'where': np.where}
+
+_COMPARISONS = {'>': np.greater, '>=': np.greater_equal, '<': np.less, '<=': np.less_equal}
+
+SENSOR_INDICES: dict[str, SensorIndex] = {}
+
+
+def register_index(name: str, expression: str, rounded: bool = False) -> None:
+    """
+    Registers an index as a formula over sensor layers (temperature, humidity,
+    wind...) and previously registered indices, written with arithmetic
+    operators and the functions log, exp, sqrt, abs and where.
+    :param name: str
+        name of the index
+    :param expression: str
+        formula of the index
+    :param rounded: bool
+        round the index to the nearest integer (like `ith`)
+    :raise ValueError: if the formula uses an unknown function
+    >>> register_index('feels_like', 'temperature - (100 - humidity) / 10')
+    >>> SENSOR_INDICES['feels_like'].inputs
+    ('temperature', 'humidity')
+    >>> del SENSOR_INDICES['feels_like']
+    >>> register_index('unknown', 'foo(temperature)')
+    Traceback (most recent call last):
+        ...
+    ValueError: Unknown function in index unknown: foo(temperature)
+    """
+    tree = ast.parse(expression, f'<{name}>', mode='eval')
+    calls = [node.func for node in ast.walk(tree) if isinstance(node, ast.Call)]
+    for function in calls:
+        if not isinstance(function, ast.Name) or function.id not in _FORMULA_FUNCTIONS:
+            raise ValueError(f"Unknown function in index {name}: {expression}")
+    functions = {id(function) for function in calls}
+    names = sorted((node for node in ast.walk(tree) if isinstance(node, ast.Name) and id(node) not in functions),
+                   key=lambda node: node.col_offset)
+    SENSOR_INDICES[name] = SensorIndex(expression, tuple(dict.fromkeys(node.id for node in names)), rounded)
+
+
+register_index('thi', '0.8 + temperature + (humidity/100) * (temperature - 14.3) + 46.4', rounded=True)
+register_index('temperature_f', 'temperature * 1.8 + 32')
+# Rothfusz regression, in Fahrenheit, converted back to Celsius
+register_index('heat_index', '(-42.379 + 2.04901523 * temperature_f + 10.14333127 * humidity'
+                             ' - 0.22475541 * temperature_f * humidity'
+                             ' - 6.83783e-3 * temperature_f ** 2 - 5.481717e-2 * humidity ** 2'
+                             ' + 1.22874e-3 * temperature_f ** 2 * humidity'
+                             ' + 8.5282e-4 * temperature_f * humidity ** 2'
+                             ' - 1.99e-6 * temperature_f ** 2 * humidity ** 2 - 32) / 1.8')
+# Magnus formula
+register_index('magnus', 'log(humidity / 100) + 17.62 * temperature / (243.12 + temperature)')
+register_index('dew_point', '243.12 * magnus / (17.62 - magnus)')
+# wind speed in km/h
+register_index('wind_chill', '13.12 + 0.6215 * temperature - 11.37 * wind ** 0.16'
+                             ' + 0.3965 * temperature * wind ** 0.16')
+
+
+def _index_order(names) -> list[str]:
+    """
+    Indices needed to compute `names`, each one after the indices it uses.
+    """
+    order = []
+
+    def visit(name, path):
+        if name in order:
+            return
+        if name in path:
+            raise ValueError(f"Index {name} depends on itself")
+        for dependency in SENSOR_INDICES[name].inputs:
+            if dependency in SENSOR_INDICES:
+                visit(dependency, path + (name,))
+        order.append(name)
+
+    for name in names:
+        if name not in SENSOR_INDICES:
+            raise ValueError(f"Unknown index {name}, expected one of {sorted(SENSOR_INDICES)}")
+        visit(name, ())
+    return order
+
+
+def sensor_indices(layers: dict[str, np.ndarray], indices=('thi',), masks: dict[str, tuple] | None = None,
+                   out: dict[str, np.ndarray] | None = None, block: int = BLOCK_SIZE,
+                   use_numexpr: bool = False) -> dict[str, np.ndarray]:
+    """
+    Computes several registered indices and threshold masks over the same
+    sensor layers in a single pass: the layers are walked in blocks of `block`
+    cells and, while a block is in cache, every index is evaluated on it (the
+    indices used by other indices, only once) and every mask is compared.
+    With `use_numexpr=True` each formula is evaluated with the optional
+    package `numexpr` (multithreaded, without temporaries), which pays off
+    on several cores; on a single core the NumPy evaluation of blocks is
+    faster. The two backends may differ in the last bit of some results
+    (for instance `heat_index` and `dew_point`), so NumPy is the default
+    and the same call gives the same bits on every machine.
+    :param layers: dict of np.ndarray
+        sensor grids by name (temperature, humidity, wind...), same shape
+    :param indices: iterable of str
+        names of the registered indices to return
+    :param masks: dict of tuple
+        masks to return, as name: (index, comparison, threshold) with a
+        comparison '>', '>=', '<' or '<='; `isStress` is ('thi', '>', 78)
+    :param out: dict of np.ndarray
+        optional C-contiguous arrays where some outputs are written
+    :param block: int
+        cells of each block
+    :param use_numexpr: bool
+        evaluate the formulas with numexpr instead of NumPy
+    :return: dict of np.ndarray
+        the requested indices and masks by name
+    :raise ValueError: if the layers do not have the same shape
+    >>> temperature, humidity = np.loadtxt('datos/temperaturas.txt'), np.loadtxt('datos/humedad.txt')
+    >>> result = sensor_indices({'temperature': temperature, 'humidity': humidity},
+    ...                         ('thi', 'dew_point', 'heat_index'), {'stress': ('thi', '>', 78)})
+    >>> sorted(result)
+    ['dew_point', 'heat_index', 'stress', 'thi']
+    >>> np.array_equal(result['thi'], ith(temperature, humidity), equal_nan=True)
+    True
+    >>> np.array_equal(result['stress'], isStress(result['thi']))
+    True
+    >>> t, h = np.array([30., 10.]), np.array([60., 100.])
+    >>> result = sensor_indices({'temperature': t, 'humidity': h, 'wind': np.array([5., 20.])},
+    ...                         ('dew_point', 'wind_chill'), use_numexpr=False)
+    >>> np.round(result['dew_point'], 2), np.round(result['wind_chill'], 2)
+    (array([21.39, 10.  ]), array([32.44,  7.38]))
+    """
+    masks = masks or {}
+    out = out or {}
+    if use_numexpr and numexpr is None:
+        raise ModuleNotFoundError("numexpr is not installed")
+    for name, (index, comparison, _) in masks.items():
+        if comparison not in _COMPARISONS:
+            raise ValueError(f"Unknown comparison {comparison!r} in mask {name}")
+    order = _index_order(list(indices) + [index for index, _, _ in masks.values()])
+    missing = {n for i in order for n in SENSOR_INDICES[i].inputs} - set(order) - set(layers)
+    if missing:
+        raise ValueError(f"Missing sensor layers: {sorted(missing)}")
+    shapes = {layer.shape for layer in layers.values()}
+    if len(shapes) != 1:
+        raise ValueError(f"Shape of data sensors must be the same: {sorted(shapes)}")
+    shape = shapes.pop()
+    size = int(np.prod(shape))
+    results = {}
+    for name in list(indices) + list(masks):
+        array = out.get(name)
+        if array is None:
+            array = np.empty(shape, dtype=bool if name in masks else np.float64)
+        elif array.shape != shape or not array.flags.c_contiguous:
+            raise ValueError(f"out[{name!r}] must be a C-contiguous array of shape {shape}")
+        results[name] = array
+    flat = {name: array.reshape(-1) for name, array in results.items()}
+    inputs = {name: layer.reshape(-1) for name, layer in layers.items()}
+    # indices that are not returned are kept only for the current block
+    buffers = {name: np.empty(min(block, size)) for name in order if name not in flat}
+    codes = {name: compile(SENSOR_INDICES[name].expression, name, 'eval') for name in order}
+    for start in range(0, size, block):
+        stop = min(start + block, size)
+        values = {name: layer[start:stop] for name, layer in inputs.items()}
+        for name in order:
+            target = flat[name][start:stop] if name in flat else buffers[name][:stop - start]
+            if use_numexpr:
+                numexpr.evaluate(SENSOR_INDICES[name].expression, local_dict=values, out=target,
+                                 casting='same_kind')
+            else:
+                with np.errstate(invalid='ignore', divide='ignore'):
+                    target[...] = eval(codes[name], {'__builtins__': {}, **_FORMULA_FUNCTIONS}, values)
+            if SENSOR_INDICES[name].rounded:
+                np.around(target, out=target)
+            values[name] = target
+        for name, (index, comparison, threshold) in masks.items():
+            _COMPARISONS[comparison](values[index], threshold, out=flat[name][start:stop])
+    return results
+
+
+def benchmark_ith(shape: tuple[int, int] = (4000, 4000), repeat: int = 5) -> dict[str, float]:
+    """
+    Compares the best time of `ith` (plus `isStress`) with `ith_fused` in
+    float64 and float32 on random grids of the given shape, and prints it.
+    :param shape: tuple
+        shape of the grids
+    :param repeat: int
+        times each version is run
+    :return: dict
+        best time in seconds of each version
+    """
+    import time
+    rng = np.random.default_rng(0)
+    temperature = rng.normal(25, 8, shape)
+    humidity = rng.uniform(0, 100, shape)
+    temperature32, humidity32 = temperature.astype(np.float32), humidity.astype(np.float32)
+    out64 = np.empty(shape)
+    out32 = np.empty(shape, dtype=np.float32)
+    versions = {
+        'ith + isStress': lambda: isStress(ith(temperature, humidity)),
+        'ith_fused float64': lambda: ith_fused(temperature, humidity, out=out64, stress=True),
+        'ith_fused float32': lambda: ith_fused(temperature32, humidity32, out=out32, stress=True),
+    }
+    times = {}
+    for name, run in versions.items():
+        best = float('inf')
+        for _ in range(repeat):
+            start = time.perf_counter()
+            run()
+            best = min(best, time.perf_counter() - start)
+        times[name] = best
+        print(f"{name:<20} {best * 1000:9.1f} ms  (x{times['ith + isStress'] / best:.2f})")
+    return times
+
+
+# value of the int16 rolling window of `THIStream` for cells whose THI is NaN
+_RING_NAN = np.iinfo(np.int16).min
+
+
+class THIStream:
+    """
+    Computes the THI of a sequence of temperature/humidity grids, one grid at
+    a time, and keeps running aggregates per cell without storing the history:
+    hours in serious stress (`isStress`), maximum THI and the mean THI of the
+    last `window` grids. The grid buffers are allocated once, in `__init__`,
+    and every update writes into them (the THI and the stress mask with
+    `ith_fused`, which also gets the stream's scratch buffers).
+    NaN cells are ignored by the aggregates (the rolling mean of a cell is the
+    mean of its valid values in the window; NaN if it has none).
+    The THI is rounded to integers, so the last `window` grids are kept as
+    int16 (with `_RING_NAN` marking NaN cells) and the rolling sums are exact.
+    Memory: 2 bytes per cell and grid in the window plus about 41 bytes per
+    cell for the other buffers; a 4000x4000 grid with a 60-grid window takes
+    about 2.6 GB, so choose the window for the size of the grids.
+    >>> stream = THIStream((1, 2), window=2, step_hours=0.5)
+    >>> for t in (10., 30., 35.):
+    ...     _ = stream.update(np.array([[t, np.nan]]), np.array([[50., 50.]]))
+    >>> stream.count, stream.stress_hours, stream.max_ith
+    (3, array([[1., 0.]]), array([[93., nan]]))
+    >>> stream.rolling_mean()
+    array([[89., nan]])
+    """
+
+    def __init__(self, shape: tuple, window: int, step_hours: float = 1.0):
+        """
+        :param shape: tuple
+            shape of the sensor grids
+        :param window: int
+            number of grids in the rolling mean (2 bytes per cell each)
+        :param step_hours: float
+            hours between two grids (can be overridden in `update`)
+        """
+        if window < 1:
+            raise ValueError(f"The window must have at least one grid: {window}")
+        self.shape = tuple(shape)
+        self.window = window
+        self.step_hours = step_hours
+        self.count = 0
+        self._ith = np.empty(self.shape)
+        self._mask = np.empty(self.shape, dtype=bool)
+        cells = min(BLOCK_SIZE, self._ith.size)
+        self._scratch = (np.empty(cells), np.empty(cells))
+        self._stress_hours = np.zeros(self.shape)
+        self._max = np.full(self.shape, np.nan)
+        # last `window` THI grids, with `_RING_NAN` where the THI is NaN
+        self._ring = np.full((window,) + self.shape, _RING_NAN, dtype=np.int16)
+        self._sum = np.zeros(self.shape, dtype=np.int64)
+        self._valid = np.zeros(self.shape, dtype=np.int64)
+
+    def update(self, temperature: np.ndarray, humidity: np.ndarray, hours: float | None = None) -> np.ndarray:
+        """
+        Adds a new pair of grids to the aggregates.
+        :param temperature: np.ndarray
+            temperatures of the new grid
+        :param humidity: np.ndarray
+            humidities of the new grid
+        :param hours: float
+            hours covered by this grid (`step_hours` by default)
+        :return: np.ndarray
+            THI of the grid; the buffer is reused by the next update
+        :raise ValueError: if the grids do not have the stream shape, or the THI
+            does not fit in int16
+        """
+        if temperature.shape != self.shape or humidity.shape != self.shape:
+            raise ValueError(f"Shape of data sensors must be {self.shape}: "
+                             f"{temperature.shape} and {humidity.shape}")
+        thi, _ = ith_fused(temperature, humidity, out=self._ith, mask_out=self._mask, scratch=self._scratch)
+        if thi.size and (np.fmin.reduce(thi, axis=None) <= _RING_NAN
+                         or np.fmax.reduce(thi, axis=None) > np.iinfo(np.int16).max):
+            raise ValueError("THI values out of the int16 range of the rolling window")
+        np.add(self._stress_hours, self.step_hours if hours is None else hours,
+               out=self._stress_hours, where=self._mask)
+        np.fmax(self._max, thi, out=self._max)
+        # rolling mean: replace the oldest grid of the window
+        ring = self._ring[self.count % self.window]
+        np.not_equal(ring, _RING_NAN, out=self._mask)
+        np.subtract(self._sum, ring, out=self._sum, where=self._mask)
+        np.subtract(self._valid, 1, out=self._valid, where=self._mask)
+        np.isnan(thi, out=self._mask)
+        np.logical_not(self._mask, out=self._mask)
+        ring.fill(_RING_NAN)
+        np.copyto(ring, thi, casting='unsafe', where=self._mask)
+        np.add(self._sum, ring, out=self._sum, where=self._mask)
+        np.add(self._valid, 1, out=self._valid, where=self._mask)
+        self.count += 1
+        return thi
+
+    @property
+    def stress_hours(self) -> np.ndarray:
+        """
+        Hours each cell has been in serious stress.
+        """
+        return self._stress_hours
+
+    @property
+    def max_ith(self) -> np.ndarray:
+        """
+        Maximum THI of each cell (NaN if it has never been valid).
+        """
+        return self._max
+
+    def rolling_mean(self, out: np.ndarray | None = None) -> np.ndarray:
+        """
+        Mean THI of each cell over the last `window` grids.
+        :param out: np.ndarray
+            optional array where the result is written
+        :return: np.ndarray
+            the rolling mean (NaN where there is no valid value)
+        """
+        if out is None:
+            out = np.empty(self.shape)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.divide(self._sum, self._valid, out=out)
+
+
+def stream_ith(grids, window: int, step_hours: float = 1.0) -> THIStream:
+    """
+    Consumes an iterable of (temperature, humidity) grids with a `THIStream`.
+    :param grids: iterable of tuple of np.ndarray
+        pairs of grids, oldest first
+    :param window: int
+        number of grids in the rolling mean
+    :param step_hours: float
+        hours between two grids
+    :return: THIStream
+        the stream with the aggregates of all the grids
+    >>> temperature, humidity = np.loadtxt('datos/temperaturas.txt'), np.loadtxt('datos/humedad.txt')
+    >>> stream = stream_ith([(temperature, humidity)] * 3, window=2)
+    >>> np.array_equal(stream.max_ith, ith(temperature, humidity), equal_nan=True)
+    True
+    >>> np.array_equal(stream.stress_hours, 3 * isStress(ith(temperature, humidity)))
+    True
+    """
+    stream = None
+    for temperature, humidity in grids:
+        if stream is None:
+            stream = THIStream(temperature.shape, window, step_hours)
+        stream.update(temperature, humidity)
+    if stream is None:
+        raise ValueError("There are no grids in the stream")
+    return stream
+
+
 # ------------ test  ----------------#
 import doctest
 
@@ -106,12 +818,25 @@ def test_doc() -> None:
     If any test is fail, we will receive the notice when executing
     :return: None
     """
+    doctest.run_docstring_examples(read_grid, globals(), verbose=True)  # vemos los resultados de los test
     doctest.run_docstring_examples(check_nulls, globals(), verbose=True)  # vemos los resultados de los test
     doctest.run_docstring_examples(ith, globals(), verbose=True)  # vemos los resultados de los test
     doctest.run_docstring_examples(isStress, globals(), verbose=False)  # solo los resultados de los test que fallan
     doctest.run_docstring_examples(summary, globals(), verbose=False)  # solo los resultados de los test que fallan
+    doctest.run_docstring_examples(summary_stats, globals(), verbose=False)  # solo los resultados de los test que fallan
+    doctest.run_docstring_examples(ith_fused, globals(), verbose=False)  # solo los resultados de los test que fallan
+    doctest.run_docstring_examples(RunningSummary, globals(), verbose=False)  # solo los resultados de los test que fallan
+    doctest.run_docstring_examples(ith_blocked, globals(), verbose=False)  # solo los resultados de los test que fallan
+    doctest.run_docstring_examples(register_index, globals(), verbose=False)  # solo los resultados de los test que fallan
+    doctest.run_docstring_examples(sensor_indices, globals(), verbose=False)  # solo los resultados de los test que fallan
+    doctest.run_docstring_examples(THIStream, globals(), verbose=False)  # solo los resultados de los test que fallan
+    doctest.run_docstring_examples(stream_ith, globals(), verbose=False)  # solo los resultados de los test que fallan
 
 
 if __name__ == "__main__":
-    test_doc()  # executing tests
+    import sys
+    if sys.argv[1:] == ['bench']:
+        benchmark_ith()
+    else:
+        test_doc()  # executing tests
 
@@ -1,3 +1,10 @@
+import hashlib
+import itertools
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
 import numpy as np
 
 
@@ -5,6 +12,10 @@ def read_data(fname: str, tipo: type) -> np.ndarray:
   """
   Lee los datos de un fichero y devuelve un array de numpy.
 
+  Los ficheros `.npy` (ver `convert_raster`) se abren proyectados en memoria
+  (`np.memmap`), sin copiarlos; el resto se leen como texto separado por
+  espacios.
+
   Parameters:
   --------
   fname: str
@@ -48,20 +59,127 @@ def read_data(fname: str, tipo: type) -> np.ndarray:
   FileNotFoundError: no se encontró el archivo archivo_que_no_existe.txt
   """
   try:
+    if fname.endswith('.npy'):
+      data = np.load(fname, mmap_mode='r')
+      return data if data.dtype == np.dtype(tipo) else data.astype(tipo)
     return np.loadtxt(fname, dtype=tipo)
   except FileNotFoundError:
       raise FileNotFoundError(f'no se encontró el archivo {fname}')
   except Exception as e:
       raise Exception(f'Error al leer el archivo {fname}: {e}')
 
-def set_of_areas(zonas: np.ndarray)-> set[int]:
+
+def convert_raster(fname: str, tipo: type, out: str | None = None) -> str:
+    """
+    Convierte una vez un raster de texto al formato binario `.npy`, que
+    `read_data` abre de forma inmediata y sin copia. El fichero se escribe
+    con otro nombre y después se renombra, así que quien lo abra a la vez
+    nunca ve una conversión a medias.
+
+    Parameters:
+    --------
+    fname: str
+        Ruta del raster de texto.
+    tipo: type
+        Tipo de dato con el que se guarda.
+    out: str | None
+        Ruta del `.npy`; por defecto, la del texto con extensión `.npy`.
+
+    Returns:
+    --------
+    str
+        Ruta del fichero binario escrito.
+
+    Examples:
+    --------
+    >>> import os, tempfile
+    >>> with tempfile.TemporaryDirectory() as tmp:
+    ...     path = convert_raster('zonas.txt', int, os.path.join(tmp, 'zonas.npy'))
+    ...     data = read_data(path, int)
+    ...     type(data).__name__, bool((data == read_data('zonas.txt', int)).all())
+    ('memmap', True)
+    """
+    if out is None:
+        out = os.path.splitext(fname)[0] + '.npy'
+    data = read_data(fname, tipo)
+    partial = f'{out}.{os.getpid()}.tmp'
+    with open(partial, 'wb') as f:
+        np.save(f, data)
+    os.replace(partial, out)
+    return out
+
+
+def open_raster(fname: str, tipo: type, cache_dir: str | None = None) -> np.ndarray:
+    """
+    Abre un raster de texto a través de su copia binaria en `cache_dir`: si
+    no existe la copia con ese tipo de dato, o es más antigua que el texto,
+    se crea con `convert_raster`; después se abre proyectada en memoria. La
+    copia se identifica por la ruta absoluta del texto y por el tipo.
+
+    No se escribe nada junto al texto. Sin `cache_dir`, o si la copia no se
+    puede escribir, el raster se lee directamente con `read_data`.
+
+    Parameters:
+    --------
+    fname: str
+        Ruta del raster de texto (o directamente de un `.npy`).
+    tipo: type
+        Tipo de dato del array resultante.
+    cache_dir: str | None
+        Directorio de las copias binarias.
+
+    Returns:
+    --------
+    np.ndarray
+        El raster, como `np.memmap` de solo lectura si viene de un `.npy`.
+
+    Examples:
+    --------
+    >>> import tempfile
+    >>> with tempfile.TemporaryDirectory() as tmp:
+    ...     simple = open_raster('valores.txt', np.float32, tmp)
+    ...     data = open_raster('valores.txt', float, tmp)
+    ...     exact = bool((data == read_data('valores.txt', float)).all())
+    ...     type(data).__name__, data.dtype, simple.dtype, exact, len(os.listdir(tmp))
+    ...     del simple, data
+    ('memmap', dtype('float64'), dtype('float32'), True, 2)
+    >>> type(open_raster('valores.txt', float)).__name__
+    'ndarray'
+    """
+    if fname.endswith('.npy') or cache_dir is None:
+        return read_data(fname, tipo)
+    source = os.path.abspath(fname)
+    stem = os.path.splitext(os.path.basename(source))[0]
+    key = hashlib.sha1(source.encode()).hexdigest()[:12]
+    binary = os.path.join(cache_dir, f'{stem}-{key}.{np.dtype(tipo).name}.npy')
+    if os.path.exists(binary) and os.path.getmtime(binary) >= os.path.getmtime(fname):
+        data = np.load(binary, mmap_mode='r')
+        if data.dtype == np.dtype(tipo):
+            return data
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        convert_raster(fname, tipo, binary)
+    except OSError:
+        return read_data(fname, tipo)
+    return read_data(binary, tipo)
+
+
+def _check_zones(zonas: np.ndarray) -> None:
+    """
+    Comprueba que las etiquetas de zona son enteros.
+    """
+    if zonas.dtype != np.int_:
+        raise TypeError(f"The elements type must be int, not {zonas.dtype}")
+
+
+def set_of_areas(zonas: 'np.ndarray | ZoneIndex')-> set[int]:
     """
     Establece las distintas zonas en un array y las devuelve en conjunto.
 
     Parameters:
     --------
-    zonas: np.ndarray
-        Array que muestra las zonas.
+    zonas: np.ndarray | ZoneIndex
+        Array que muestra las zonas, o su índice (sin recorrer el raster).
 
     Returns:
     --------
@@ -86,19 +204,319 @@ def set_of_areas(zonas: np.ndarray)-> set[int]:
         ...
     TypeError: The elements type must be int, not float64
     """
-    if zonas.dtype != np.int_:
-        raise TypeError(f"The elements type must be int, not {zonas.dtype}")
+    if isinstance(zonas, ZoneIndex):
+        return set(zonas.labels.tolist())
+    _check_zones(zonas)
     return set(zonas.flatten())
 
 
-def mean_areas(zonas: np.ndarray, valores: np.ndarray) -> np.ndarray:
+ZONAL_STATS = ('count', 'sum', 'mean', 'min', 'max', 'std')
+
+
+class ZoneIndex:
     """
-    Calcula la media de las zonas geográficas.
+    Índice de un raster de zonas, construido una sola vez para calcular
+    estadísticas zonales de muchas capas de valores con la misma zonificación.
+
+    Guarda las etiquetas ordenadas, el índice de cada celda en esas etiquetas,
+    el número de celdas de cada zona y, como una matriz dispersa CSR, las
+    celdas de cada zona (`cells`): las de la zona i son
+    `order[offsets[i]:offsets[i + 1]]`. Con `rle=True` guarda además las filas
+    codificadas por tramos de celdas consecutivas de la misma zona, con los
+    que la suma, el mínimo y el máximo se reducen por tramos en lugar de por
+    celdas (útil si las zonas son grandes y compactas).
+
+    Con el índice, cada capa de valores se resuelve con una reducción, sin
+    volver a ordenar las etiquetas. `zonal_stats`, `zonal_raster`,
+    `mean_areas` y `set_of_areas` aceptan un `ZoneIndex` en lugar de `zonas`.
+    Los arrays del índice son de solo lectura y las estadísticas que se
+    calculan con él no los comparten, así que modificarlas no lo altera.
 
     Parameters:
     --------
     zonas: np.ndarray
         Datos que representan las zonas geográficas.
+    rle: bool
+        Si se codifican las filas por tramos.
+
+    Raises:
+    --------
+    TypeError:
+        Si las zonas no son de tipo int.
+
+    Examples:
+    --------
+    >>> zonas = read_data('zonas.txt', int)
+    >>> index = ZoneIndex(zonas, rle=True)
+    >>> index.labels, index.counts, index.offsets
+    (array([1, 2, 3, 4]), array([ 9,  9, 16,  2]), array([ 0,  9, 18, 34, 36]))
+    >>> index.cells(4)
+    array([17, 23])
+    >>> len(index.runs[0])
+    16
+    >>> valores = read_data('valores.txt', float)
+    >>> stats = zonal_stats(index, valores)
+    >>> all(np.allclose(stats[k], v) for k, v in zonal_stats(zonas, valores).items())
+    True
+    >>> np.array_equal(mean_areas(index, valores), mean_areas(zonas, valores))
+    True
+    >>> stats['count'][:] = 0
+    >>> index.counts
+    array([ 9,  9, 16,  2])
+    >>> index.counts[0] = 0
+    Traceback (most recent call last):
+    ...
+    ValueError: assignment destination is read-only
+    """
+
+    def __init__(self, zonas: np.ndarray, rle: bool = False):
+        """
+        Construye el índice de `zonas`.
+        """
+        _check_zones(zonas)
+        self._shape = np.shape(zonas)
+        self._labels, inverse = np.unique(zonas, return_inverse=True)
+        self._inverse = inverse.reshape(-1)
+        self._counts = np.bincount(self._inverse, minlength=len(self._labels))
+        self._order = np.argsort(self._inverse, kind='stable')
+        self._offsets = np.concatenate(([0], np.cumsum(self._counts)))
+        self._runs = self._row_runs() if rle else None
+        for array in (self._labels, self._inverse, self._counts, self._order, self._offsets, *(self._runs or ())):
+            array.setflags(write=False)
+
+    def _row_runs(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        inverse = self._inverse
+        change = np.ones(inverse.size, dtype=bool)
+        np.not_equal(inverse[1:], inverse[:-1], out=change[1:])
+        # Los tramos no pasan de una fila a la siguiente.
+        change[::self._shape[-1] if self._shape and self._shape[-1] else 1] = True
+        starts = np.flatnonzero(change)
+        lengths = np.diff(np.append(starts, inverse.size))
+        return starts, lengths, inverse[starts]
+
+    @property
+    def shape(self) -> tuple:
+        """
+        Obtiene las dimensiones del raster de zonas.
+        """
+        return self._shape
+
+    @property
+    def labels(self) -> np.ndarray:
+        """
+        Obtiene las etiquetas de las zonas, ordenadas.
+        """
+        return self._labels
+
+    @property
+    def inverse(self) -> np.ndarray:
+        """
+        Obtiene el índice en `labels` de cada celda, con la forma del raster.
+        """
+        return self._inverse.reshape(self._shape)
+
+    @property
+    def counts(self) -> np.ndarray:
+        """
+        Obtiene el número de celdas de cada zona.
+        """
+        return self._counts
+
+    @property
+    def order(self) -> np.ndarray:
+        """
+        Obtiene las posiciones (en el raster aplanado) de las celdas ordenadas por zona.
+        """
+        return self._order
+
+    @property
+    def offsets(self) -> np.ndarray:
+        """
+        Obtiene dónde empiezan en `order` las celdas de cada zona (y el total al final).
+        """
+        return self._offsets
+
+    @property
+    def runs(self) -> tuple[np.ndarray, np.ndarray, np.ndarray] | None:
+        """
+        Obtiene los tramos de las filas (inicio en el raster aplanado, longitud
+        e índice de la zona), o None si el índice se creó sin `rle`.
+        """
+        return self._runs
+
+    def cells(self, label: int) -> np.ndarray:
+        """
+        Obtiene las posiciones (en el raster aplanado) de las celdas de una zona.
+
+        Raises:
+        --------
+        KeyError
+            Si la zona no existe.
+        """
+        i = np.searchsorted(self._labels, label)
+        if i == len(self._labels) or self._labels[i] != label:
+            raise KeyError(label)
+        return self._order[self._offsets[i]:self._offsets[i + 1]]
+
+    def partial(self, valores: np.ndarray) -> dict[str, np.ndarray]:
+        """
+        Calcula los agregados combinables de cada zona (como `ZonalAccumulator`)
+        para una capa de valores con las dimensiones del índice.
+        """
+        values = np.asarray(valores, dtype=np.float64).reshape(-1)
+        inverse, n = self._inverse, len(self._labels)
+        count = self._counts.copy()
+        if self._runs is None:
+            total = np.bincount(inverse, weights=values, minlength=n)
+            # Mínimo y máximo de cada tramo de celdas ordenadas por zona.
+            ordered = values[self._order]
+            minimum = np.minimum.reduceat(ordered, self._offsets[:-1]) if n else np.empty(0)
+            maximum = np.maximum.reduceat(ordered, self._offsets[:-1]) if n else np.empty(0)
+        else:
+            starts, _, zone = self._runs
+            total = np.bincount(zone, weights=np.add.reduceat(values, starts), minlength=n)
+            minimum = np.full(n, np.inf)
+            maximum = np.full(n, -np.inf)
+            if n:
+                np.minimum.at(minimum, zone, np.minimum.reduceat(values, starts))
+                np.maximum.at(maximum, zone, np.maximum.reduceat(values, starts))
+        # Desviaciones respecto a la media ya calculada (dos pasadas) para no
+        # perder precisión restando sumas de cuadrados grandes.
+        deviation = values - (total / count)[inverse]
+        m2 = np.bincount(inverse, weights=deviation * deviation, minlength=n)
+        return {'count': count, 'sum': total, 'm2': m2, 'min': minimum, 'max': maximum}
+
+
+def _zonal_partial(zonas: np.ndarray, valores: np.ndarray) -> tuple[np.ndarray, np.ndarray, dict[str, np.ndarray]]:
+    """
+    Calcula los agregados combinables de cada zona (número de celdas, suma,
+    suma de cuadrados de las desviaciones, mínimo y máximo) con reducciones
+    indexadas por etiqueta, sin recorrer el raster una vez por zona.
+
+    Returns:
+    --------
+    tuple
+        Las etiquetas ordenadas, el índice de cada celda en esas etiquetas
+        (con la forma de `zonas`) y un diccionario con cada agregado.
+    """
+    index = zonas if isinstance(zonas, ZoneIndex) else ZoneIndex(zonas)
+    return index.labels.copy(), index.inverse, index.partial(valores)
+
+
+def _zonal_finish(partial: dict[str, np.ndarray]) -> dict[str, np.ndarray]:
+    """
+    Obtiene las estadísticas de `ZONAL_STATS` a partir de los agregados.
+    """
+    count = partial['count']
+    return {'count': count, 'sum': partial['sum'], 'mean': partial['sum'] / count,
+            'min': partial['min'], 'max': partial['max'], 'std': np.sqrt(partial['m2'] / count)}
+
+
+def _zonal_reduce(zonas: np.ndarray, valores: np.ndarray) -> tuple[np.ndarray, np.ndarray, dict[str, np.ndarray]]:
+    """
+    Calcula todas las estadísticas de `ZONAL_STATS` para cada zona.
+
+    Returns:
+    --------
+    tuple
+        Las etiquetas ordenadas, el índice de cada celda en esas etiquetas
+        (con la forma de `zonas`) y un diccionario con cada estadística.
+    """
+    labels, inverse, partial = _zonal_partial(zonas, valores)
+    return labels, inverse, _zonal_finish(partial)
+
+
+def zonal_stats(zonas: np.ndarray | ZoneIndex, valores: np.ndarray) -> dict[str, np.ndarray]:
+    """
+    Calcula, en una sola pasada por etiqueta, el número de celdas, la suma, la
+    media, el mínimo, el máximo y la desviación típica de cada zona.
+
+    Parameters:
+    --------
+    zonas: np.ndarray | ZoneIndex
+        Datos que representan las zonas geográficas, o su índice.
+    valores: np.ndarray
+        Valores de las celdas del área total.
+
+    Returns:
+    --------
+    dict[str, np.ndarray]
+        'zone' con las etiquetas ordenadas y, alineadas con ellas, las
+        estadísticas de `ZONAL_STATS`.
+
+    Raises:
+    --------
+    IndexError
+        Si los arrays de entrada no tienen las mismas dimensiones.
+    TypeError:
+        Si las zonas no son de tipo int.
+
+    Examples:
+    --------
+    >>> zonas = np.array([[1, 1], [2, 2]], dtype=np.int_)
+    >>> valores = np.array([[10, 20], [30, 50]], dtype=np.int_)
+    >>> {k: v.tolist() for k, v in zonal_stats(zonas, valores).items()}
+    {'zone': [1, 2], 'count': [2, 2], 'sum': [30.0, 80.0], 'mean': [15.0, 40.0], 'min': [10.0, 30.0], 'max': [20.0, 50.0], 'std': [5.0, 10.0]}
+    """
+    if zonas.shape != valores.shape:
+        raise IndexError("Input arrays must have the same dimensions")
+    labels, _, stats = _zonal_reduce(zonas, valores)
+    return {'zone': labels, **stats}
+
+
+def zonal_raster(zonas: np.ndarray | ZoneIndex, valores: np.ndarray, stat: str = 'mean') -> np.ndarray:
+    """
+    Devuelve un raster con la forma de `zonas` en el que cada celda tiene la
+    estadística `stat` de su zona.
+
+    Parameters:
+    --------
+    zonas: np.ndarray | ZoneIndex
+        Datos que representan las zonas geográficas, o su índice.
+    valores: np.ndarray
+        Valores de las celdas del área total.
+    stat: str
+        Una de `ZONAL_STATS`.
+
+    Returns:
+    --------
+    np.ndarray
+        Array con la estadística de cada zona en sus celdas.
+
+    Raises:
+    --------
+    IndexError
+        Si los arrays de entrada no tienen las mismas dimensiones.
+    ValueError
+        Si la estadística no existe.
+
+    Examples:
+    --------
+    >>> zonas = np.array([[1, 1], [2, 2]], dtype=np.int_)
+    >>> valores = np.array([[10, 20], [30, 50]], dtype=np.int_)
+    >>> zonal_raster(zonas, valores, 'max')
+    array([[20., 20.],
+           [50., 50.]])
+    """
+    if stat not in ZONAL_STATS:
+        raise ValueError(f"Unknown statistic {stat!r}, expected one of {ZONAL_STATS}")
+    if zonas.shape != valores.shape:
+        raise IndexError("Input arrays must have the same dimensions")
+    _, inverse, stats = _zonal_reduce(zonas, valores)
+    return stats[stat][inverse]
+
+
+def mean_areas(zonas: np.ndarray | ZoneIndex, valores: np.ndarray) -> np.ndarray:
+    """
+    Calcula la media de las zonas geográficas.
+
+    Todas las zonas se resuelven a la vez con `zonal_stats`, sin construir
+    una máscara del raster completo por cada zona.
+
+    Parameters:
+    --------
+    zonas: np.ndarray | ZoneIndex
+        Datos que representan las zonas geográficas, o su índice.
     valores: np.ndarray
         Valores de las celdas del área total.
 
@@ -136,16 +554,370 @@ def mean_areas(zonas: np.ndarray, valores: np.ndarray) -> np.ndarray:
     ...
     IndexError: Input arrays must have the same dimensions
     """
+    return np.round(zonal_raster(zonas, valores, 'mean'), 1)
+
+
+class ZonalAccumulator:
+    """
+    Acumula estadísticas por zona a partir de fragmentos del raster (ventanas
+    de filas, teselas o resultados de otros procesos) sin guardar los datos.
+
+    Para cada zona guarda el número de celdas, la suma, la suma de cuadrados
+    de las desviaciones respecto a la media, el mínimo y el máximo; dos
+    acumuladores se combinan con `merge` (fórmula de Chan et al. para la
+    suma de cuadrados). La memoria solo depende del número de zonas.
+
+    Con un único fragmento el resultado es idéntico al de `zonal_stats`; con
+    varios, los recuentos, mínimos y máximos son idénticos, las sumas y las
+    medias coinciden salvo el redondeo del orden de suma (exactamente si los
+    valores son enteros) y la desviación típica salvo el redondeo.
+
+    Examples:
+    --------
+    >>> zonas = np.array([[1, 1, 2], [2, 3, 3]], dtype=np.int_)
+    >>> valores = np.array([[1., 2., 3.], [4., 5., 7.]])
+    >>> acc = ZonalAccumulator()
+    >>> acc.update(zonas[:1], valores[:1])
+    >>> acc.update(zonas[1:], valores[1:])
+    >>> {k: v.tolist() for k, v in acc.result().items()}
+    {'zone': [1, 2, 3], 'count': [2, 2, 2], 'sum': [3.0, 7.0, 12.0], 'mean': [1.5, 3.5, 6.0], 'min': [1.0, 3.0, 5.0], 'max': [2.0, 4.0, 7.0], 'std': [0.5, 0.5, 1.0]}
+    """
+
+    def __init__(self):
+        """
+        Crea un acumulador sin zonas.
+        """
+        self._labels = np.empty(0, dtype=np.int_)
+        self._partial = {'count': np.empty(0, dtype=np.int64), 'sum': np.empty(0), 'm2': np.empty(0),
+                         'min': np.empty(0), 'max': np.empty(0)}
+
+    @property
+    def labels(self) -> np.ndarray:
+        """
+        Obtiene las etiquetas de las zonas vistas hasta ahora, ordenadas.
+        """
+        return self._labels
+
+    def update(self, zonas: np.ndarray, valores: np.ndarray) -> None:
+        """
+        Añade un fragmento del raster.
+
+        Raises:
+        --------
+        IndexError
+            Si los arrays de entrada no tienen las mismas dimensiones.
+        TypeError:
+            Si las zonas no son de tipo int.
+        """
+        if zonas.shape != valores.shape:
+            raise IndexError("Input arrays must have the same dimensions")
+        _check_zones(zonas)
+        labels, _, partial = _zonal_partial(zonas, valores)
+        self._combine(labels, partial)
+
+    def merge(self, other: 'ZonalAccumulator') -> None:
+        """
+        Combina con este acumulador los fragmentos acumulados en otro.
+        """
+        self._combine(other._labels, other._partial)
+
+    def _combine(self, labels: np.ndarray, partial: dict[str, np.ndarray]) -> None:
+        if not len(self._labels):
+            self._labels, self._partial = labels, dict(partial)
+            return
+        mine, theirs = self._partial, partial
+        union = np.union1d(self._labels, labels)
+        ia = np.searchsorted(union, self._labels)
+        ib = np.searchsorted(union, labels)
+
+        def spread(values: np.ndarray, index: np.ndarray, fill: float) -> np.ndarray:
+            out = np.full(len(union), fill, dtype=values.dtype)
+            out[index] = values
+            return out
+
+        na = spread(mine['count'], ia, 0)
+        nb = spread(theirs['count'], ib, 0)
+        count = na + nb
+        sa = spread(mine['sum'], ia, 0.0)
+        sb = spread(theirs['sum'], ib, 0.0)
+        # Media de cada parte (0 si no tiene celdas de esa zona).
+        with np.errstate(invalid='ignore', divide='ignore'):
+            delta = np.where(nb > 0, sb / nb, 0.0) - np.where(na > 0, sa / na, 0.0)
+        m2 = spread(mine['m2'], ia, 0.0) + spread(theirs['m2'], ib, 0.0) + delta * delta * na * nb / count
+        self._labels = union
+        self._partial = {
+            'count': count,
+            'sum': sa + sb,
+            'm2': m2,
+            # Los huecos son neutros (±inf) y un NaN se propaga como en `zonal_stats`.
+            'min': np.minimum(spread(mine['min'], ia, np.inf), spread(theirs['min'], ib, np.inf)),
+            'max': np.maximum(spread(mine['max'], ia, -np.inf), spread(theirs['max'], ib, -np.inf)),
+        }
+
+    def result(self) -> dict[str, np.ndarray]:
+        """
+        Devuelve las estadísticas en el mismo formato que `zonal_stats`.
+        """
+        return {'zone': self._labels, **_zonal_finish(self._partial)}
+
+
+def read_blocks(fname: str, tipo: type, rows: int):
+    """
+    Lee un raster de texto por bloques de `rows` filas, sin cargarlo entero.
+
+    Parameters:
+    --------
+    fname: str
+        Ruta del archivo.
+    tipo: type
+        Tipo de dato de los bloques.
+    rows: int
+        Número de filas de cada bloque.
+
+    Returns:
+    --------
+    Iterator[np.ndarray]
+        Los bloques de filas, de arriba abajo.
+
+    Examples:
+    --------
+    >>> [block.shape for block in read_blocks('zonas.txt', int, 4)]
+    [(4, 6), (2, 6)]
+    """
+    with open(fname) as f:
+        while True:
+            lines = list(itertools.islice(f, rows))
+            if not lines:
+                return
+            yield np.loadtxt(lines, dtype=tipo, ndmin=2)
+
+
+def _row_blocks(raster, tipo: type, rows: int):
+    """
+    Recorre por bloques de filas un raster dado como array (también un
+    `np.memmap`) o como ruta de un fichero de texto.
+    """
+    if isinstance(raster, str):
+        yield from read_blocks(raster, tipo, rows)
+    else:
+        for start in range(0, raster.shape[0], rows):
+            yield np.asarray(raster[start:start + rows])
+
+
+def _file_offset(raster: np.memmap) -> int | None:
+    """
+    Posición en su fichero del primer byte de un `np.memmap`. Al recortar un
+    memmap, `offset` sigue siendo el del original, así que se suma la
+    distancia en memoria entre el recorte y el memmap que proyecta el
+    fichero. Devuelve None si no se encuentra ese memmap.
+    """
+    root = raster
+    while isinstance(root.base, np.ndarray):
+        root = root.base
+    if not isinstance(root, np.memmap) or root.filename != raster.filename:
+        return None
+    return root.offset + (raster.ctypes.data - root.ctypes.data)
+
+
+def _share(raster: np.ndarray, segments: list) -> tuple:
+    """
+    Describe cómo abrir el raster desde otro proceso sin enviarle los datos:
+    los `np.memmap` contiguos se vuelven a proyectar desde su fichero y el
+    resto se copian una vez a memoria compartida (el segmento se añade a
+    `segments` para liberarlo al terminar).
+    """
+    if isinstance(raster, np.memmap) and raster.filename is not None \
+            and (raster.flags.c_contiguous or raster.flags.f_contiguous):
+        offset = _file_offset(raster)
+        if offset is not None:
+            order = 'C' if raster.flags.c_contiguous else 'F'
+            return ('memmap', raster.filename, offset, raster.dtype.str, raster.shape, order)
+    raster = np.asarray(raster)
+    segment = shared_memory.SharedMemory(create=True, size=max(raster.nbytes, 1))
+    segments.append(segment)
+    np.ndarray(raster.shape, dtype=raster.dtype, buffer=segment.buf)[...] = raster
+    return ('shm', segment.name, 0, raster.dtype.str, raster.shape, 'C')
+
+
+def _attach(source: tuple):
+    """
+    Abre en un proceso trabajador un raster descrito por `_share`. Devuelve
+    el array y el segmento de memoria compartida (o None) que hay que cerrar.
+    """
+    kind, name, offset, dtype, shape, order = source
+    if kind == 'memmap':
+        return np.memmap(name, dtype=dtype, mode='r', offset=offset, shape=shape, order=order), None
+    segment = shared_memory.SharedMemory(name=name)
+    return np.ndarray(shape, dtype=dtype, buffer=segment.buf), segment
+
+
+def _band_partial(zone_source: tuple, value_source: tuple, start: int, stop: int) -> tuple:
+    """
+    Trabajo de cada proceso: agregados de una banda de filas.
+    """
+    zonas, zone_segment = _attach(zone_source)
+    valores, value_segment = _attach(value_source)
+    try:
+        labels, _, partial = _zonal_partial(np.asarray(zonas[start:stop]), np.asarray(valores[start:stop]))
+    finally:
+        del zonas, valores
+        for segment in (zone_segment, value_segment):
+            if segment is not None:
+                segment.close()
+    return labels, partial
+
+
+def zonal_stats_tiled(zonas, valores, tile_rows: int = 1024, workers: int = 1) -> dict[str, np.ndarray]:
+    """
+    Igual que `zonal_stats`, pero recorriendo los rasters por ventanas de
+    `tile_rows` filas, de modo que la memoria necesaria depende del tamaño de
+    la ventana y del número de zonas, no del tamaño del raster.
+
+    Con `workers > 1` las bandas de filas se reparten entre procesos. Los
+    rasters no se envían a los procesos: los `np.memmap` se abren de nuevo
+    desde su fichero y los arrays en memoria se copian una vez a
+    `multiprocessing.shared_memory`. Los agregados de cada banda se combinan
+    en el orden de las bandas, igual que en serie, así que el resultado es
+    idéntico bit a bit al de `workers=1` con el mismo `tile_rows`.
+
+    Parameters:
+    --------
+    zonas: np.ndarray | str
+        Zonas como array (o `np.memmap`) o como ruta a un fichero de texto.
+    valores: np.ndarray | str
+        Valores de las celdas, del mismo modo.
+    tile_rows: int
+        Número de filas de cada ventana.
+    workers: int
+        Número de procesos; con más de uno los rasters deben ser arrays (las
+        rutas `.npy` se abren con `read_data`).
+
+    Returns:
+    --------
+    dict[str, np.ndarray]
+        El mismo diccionario que `zonal_stats`.
+
+    Raises:
+    --------
+    IndexError
+        Si los rasters no tienen las mismas dimensiones.
+    ValueError
+        Si se piden varios procesos con rasters de texto.
+
+    Examples:
+    --------
+    >>> tiled = zonal_stats_tiled('zonas.txt', 'valores.txt', tile_rows=4)
+    >>> full = zonal_stats(read_data('zonas.txt', int), read_data('valores.txt', float))
+    >>> all(np.allclose(tiled[k], full[k]) for k in full)
+    True
+
+    Un NaN en una ventana se propaga igual que en memoria:
+
+    >>> zonas = np.array([[1, 1], [1, 1]], dtype=np.int_)
+    >>> valores = np.array([[np.nan, 2.], [3., 4.]])
+    >>> zonal_stats_tiled(zonas, valores, tile_rows=1)['min'], zonal_stats(zonas, valores)['min']
+    (array([nan]), array([nan]))
+    >>> zonas, valores = read_data('zonas.txt', int), read_data('valores.txt', float)
+    >>> serial = zonal_stats_tiled(zonas, valores, tile_rows=2)
+    >>> parallel = zonal_stats_tiled(zonas, valores, tile_rows=2, workers=2)
+    >>> all(np.array_equal(serial[k], parallel[k]) for k in serial)
+    True
+
+    Los recortes de un `np.memmap` se abren desde la posición del recorte:
+
+    >>> import tempfile
+    >>> with tempfile.TemporaryDirectory() as tmp:
+    ...     zm = read_data(convert_raster('zonas.txt', int, os.path.join(tmp, 'zonas.npy')), int)
+    ...     vm = read_data(convert_raster('valores.txt', float, os.path.join(tmp, 'valores.npy')), float)
+    ...     serial = zonal_stats_tiled(zm[2:], vm[2:], tile_rows=2)
+    ...     parallel = zonal_stats_tiled(zm[2:], vm[2:], tile_rows=2, workers=2)
+    ...     del zm, vm
+    >>> all(np.array_equal(serial[k], parallel[k]) for k in serial)
+    True
+    >>> serial['count']
+    array([ 9, 13,  2])
+    """
+    if workers > 1:
+        return _zonal_stats_parallel(zonas, valores, tile_rows, workers)
+    accumulator = ZonalAccumulator()
+    blocks = itertools.zip_longest(_row_blocks(zonas, int, tile_rows),
+                                   _row_blocks(valores, float, tile_rows))
+    for zone_block, value_block in blocks:
+        if zone_block is None or value_block is None:
+            raise IndexError("Input arrays must have the same dimensions")
+        accumulator.update(zone_block, value_block)
+    return accumulator.result()
+
+
+def _zonal_stats_parallel(zonas, valores, tile_rows: int, workers: int) -> dict[str, np.ndarray]:
+    rasters = []
+    for raster, tipo in ((zonas, int), (valores, float)):
+        if isinstance(raster, str):
+            if not raster.endswith('.npy'):
+                raise ValueError(f"Parallel zonal statistics need arrays or .npy files, not {raster}")
+            raster = read_data(raster, tipo)
+        rasters.append(raster)
+    zonas, valores = rasters
     if zonas.shape != valores.shape:
         raise IndexError("Input arrays must have the same dimensions")
+    _check_zones(zonas)
+    segments = []
+    try:
+        zone_source = _share(zonas, segments)
+        value_source = _share(valores, segments)
+        starts = range(0, zonas.shape[0], tile_rows)
+        accumulator = ZonalAccumulator()
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            partials = pool.map(_band_partial, itertools.repeat(zone_source), itertools.repeat(value_source),
+                                starts, [start + tile_rows for start in starts])
+            for labels, partial in partials:
+                accumulator._combine(labels, partial)
+    finally:
+        for segment in segments:
+            segment.close()
+            segment.unlink()
+    return accumulator.result()
+
+
+def benchmark_parallel(shape: tuple[int, int] = (4000, 4000), zones: int = 100_000,
+                       tile_rows: int = 250, max_workers: int | None = None) -> dict[int, float]:
+    """
+    Mide el tiempo de `zonal_stats_tiled` sobre rasters aleatorios con 1, 2,
+    4, ... procesos hasta `max_workers` (por defecto, los núcleos de la
+    máquina) y muestra la aceleración respecto a un proceso.
+
+    Parameters:
+    --------
+    shape: tuple[int, int]
+        Dimensiones de los rasters.
+    zones: int
+        Número de zonas distintas.
+    tile_rows: int
+        Filas de cada banda.
+    max_workers: int | None
+        Número máximo de procesos.
 
-    unique_zones = set_of_areas(zonas)
-    result = np.zeros_like(valores, dtype=np.float_)
-    for zone in unique_zones:
-        mask = zonas == zone
-        mean_value = valores[mask].mean()
-        result[mask] = round(mean_value, 1)
-    return result
+    Returns:
+    --------
+    dict[int, float]
+        Segundos que tarda cada número de procesos.
+    """
+    rng = np.random.default_rng(0)
+    zonas = rng.integers(0, zones, size=shape).astype(np.int_)
+    valores = rng.random(shape)
+    max_workers = max_workers or os.cpu_count() or 1
+    counts = sorted({1, max_workers} | {2 ** i for i in range(max_workers.bit_length()) if 2 ** i <= max_workers})
+    times = {}
+    reference = None
+    for workers in counts:
+        start = time.perf_counter()
+        result = zonal_stats_tiled(zonas, valores, tile_rows, workers)
+        times[workers] = time.perf_counter() - start
+        if reference is None:
+            reference = result
+        assert all(np.array_equal(reference[k], result[k]) for k in reference)
+        print(f"{workers:>3} procesos: {times[workers]:.3f} s (x{times[1] / times[workers]:.2f})")
+    return times
 
 
 # ------------ test  --------#
@@ -158,9 +930,21 @@ def test_doc()-> None:
     :return: None
     """
     doctest.run_docstring_examples(read_data, globals(), verbose=True)  # vemos los resultados de los test que fallan
+    doctest.run_docstring_examples(convert_raster, globals(), verbose=True)  # vemos los resultados de los test que fallan
+    doctest.run_docstring_examples(open_raster, globals(), verbose=True)  # vemos los resultados de los test que fallan
     doctest.run_docstring_examples(set_of_areas, globals(), verbose=True)  # vemos los resultados de los test que fallan
+    doctest.run_docstring_examples(ZoneIndex, globals(), verbose=True)  # vemos los resultados de los test que fallan
+    doctest.run_docstring_examples(zonal_stats, globals(), verbose=True)  # vemos los resultados de los test que fallan
+    doctest.run_docstring_examples(zonal_raster, globals(), verbose=True)  # vemos los resultados de los test que fallan
     doctest.run_docstring_examples(mean_areas, globals(), verbose=True)  # vemos los resultados de los test que fallan
+    doctest.run_docstring_examples(ZonalAccumulator, globals(), verbose=True)  # vemos los resultados de los test que fallan
+    doctest.run_docstring_examples(read_blocks, globals(), verbose=True)  # vemos los resultados de los test que fallan
+    doctest.run_docstring_examples(zonal_stats_tiled, globals(), verbose=True)  # vemos los resultados de los test que fallan
 
 
 if __name__ == "__main__":
-    test_doc()   # executing tests
+    import sys
+    if sys.argv[1:] == ['bench']:
+        benchmark_parallel()
+    else:
+        test_doc()   # executing tests
@@ -0,0 +1,178 @@
+from geom2d.Point import Point
+from geom2d.PointArray import PointArray
+from typing import Iterable
+import heapq
+import math
+import numpy as np
+
+
+class KDTree:
+    """
+    Índice espacial de una colección de puntos para buscar los k vecinos más
+    cercanos, los puntos a menos de una distancia y los puntos dentro de un
+    rectángulo, recorriendo solo las ramas del árbol que pueden contenerlos
+    (del orden de log n nodos por consulta en lugar de los n puntos).
+
+    El árbol se construye de una vez (con particiones por la mediana de
+    NumPy) y se guarda en arrays, sin un objeto por nodo: cada nodo es un
+    tramo de los puntos reordenados, que se divide por la mitad en el eje
+    en el que los puntos están más dispersos. Las consultas devuelven las
+    posiciones de los puntos en la colección original.
+    """
+
+    def __init__(self, points: PointArray | Iterable[Point], leaf_size: int = 16):
+        """
+        Construye el índice de los puntos, dados como `PointArray` o como
+        objetos `Point` (o cualquier objeto con coordenadas x e y).
+        """
+        if leaf_size < 1:
+            raise ValueError("Las hojas deben tener al menos un punto")
+        if not isinstance(points, PointArray):
+            points = PointArray.from_points(points)
+        xy = np.column_stack((points.x, points.y))
+        n = len(xy)
+        self._leaf_size = leaf_size
+        order = np.arange(n)
+        # eje y valor de corte de cada nodo interno, guardados en su punto medio
+        axes = np.zeros(n, dtype=np.int8)
+        splits = np.zeros(n)
+        stack = [(0, n)]
+        while stack:
+            lo, hi = stack.pop()
+            if hi - lo <= leaf_size:
+                continue
+            mid = (lo + hi) // 2
+            node = xy[lo:hi]
+            axis = int(np.argmax(node.max(axis=0) - node.min(axis=0)))
+            part = np.argpartition(node[:, axis], mid - lo)
+            xy[lo:hi] = node[part]
+            order[lo:hi] = order[lo:hi][part]
+            axes[mid] = axis
+            splits[mid] = xy[mid, axis]
+            stack.append((lo, mid))
+            stack.append((mid, hi))
+        self._ids = order
+        self._xy = xy
+        # las consultas recorren los nodos en Python: listas para no pagar
+        # la conversión de escalares de NumPy en cada acceso
+        self._axes = axes.tolist()
+        self._splits = splits.tolist()
+        self._coords = (self._xy[:, 0].tolist(), self._xy[:, 1].tolist())
+        self._id_list = order.tolist()
+
+    def __len__(self) -> int:
+        """
+        Número de puntos del índice.
+        """
+        return len(self._ids)
+
+    def nearest(self, point: Point, k: int = 1) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Busca los `k` puntos más cercanos a `point`.
+
+        Devuelve sus distancias (de menor a mayor) y sus posiciones en la
+        colección original.
+        """
+        if k < 1:
+            raise ValueError("k debe ser al menos 1")
+        heap = []   # (-distancia², posición) de los k mejores hasta ahora
+        self._nearest(0, len(self._ids), point.x, point.y, min(k, len(self._ids)), heap)
+        heap.sort(reverse=True)
+        return (np.sqrt([-d2 for d2, _ in heap]).astype(np.float64),
+                np.array([i for _, i in heap], dtype=np.intp))
+
+    def _nearest(self, lo: int, hi: int, px: float, py: float, k: int, heap: list) -> None:
+        if hi - lo <= self._leaf_size:
+            xs, ys = self._coords
+            ids = self._id_list
+            for i in range(lo, hi):
+                dx, dy = xs[i] - px, ys[i] - py
+                d2 = dx * dx + dy * dy
+                if len(heap) < k:
+                    heapq.heappush(heap, (-d2, ids[i]))
+                elif d2 < -heap[0][0]:
+                    heapq.heapreplace(heap, (-d2, ids[i]))
+            return
+        mid = (lo + hi) // 2
+        diff = (px if self._axes[mid] == 0 else py) - self._splits[mid]
+        if diff >= 0:
+            self._nearest(mid, hi, px, py, k, heap)
+            if len(heap) < k or diff * diff < -heap[0][0]:
+                self._nearest(lo, mid, px, py, k, heap)
+        else:
+            self._nearest(lo, mid, px, py, k, heap)
+            if len(heap) < k or diff * diff < -heap[0][0]:
+                self._nearest(mid, hi, px, py, k, heap)
+
+    def within(self, point: Point, radius: float) -> np.ndarray:
+        """
+        Busca los puntos a una distancia menor o igual que `radius` de
+        `point` y devuelve sus posiciones (ordenadas) en la colección original.
+        """
+        px, py = point.x, point.y
+        return self._search(px - radius, py - radius, px + radius, py + radius, (px, py, radius * radius))
+
+    def in_bbox(self, xmin: float, ymin: float, xmax: float, ymax: float) -> np.ndarray:
+        """
+        Busca los puntos dentro del rectángulo (bordes incluidos) y devuelve
+        sus posiciones (ordenadas) en la colección original.
+        """
+        return self._search(xmin, ymin, xmax, ymax, None)
+
+    def _search(self, xmin: float, ymin: float, xmax: float, ymax: float, circle) -> np.ndarray:
+        low, high = (xmin, ymin), (xmax, ymax)
+        ranges = []
+        stack = [(0, len(self._ids))]
+        while stack:
+            lo, hi = stack.pop()
+            if hi - lo <= self._leaf_size:
+                ranges.append((lo, hi))
+                continue
+            mid = (lo + hi) // 2
+            axis, split = self._axes[mid], self._splits[mid]
+            if low[axis] <= split:
+                stack.append((lo, mid))
+            if high[axis] >= split:
+                stack.append((mid, hi))
+        if not ranges:
+            return np.empty(0, dtype=np.intp)
+        # las hojas alcanzadas se filtran de una vez con NumPy
+        cells = np.concatenate([np.arange(lo, hi) for lo, hi in ranges])
+        x, y = self._xy[cells, 0], self._xy[cells, 1]
+        if circle is None:
+            inside = (x >= xmin) & (x <= xmax) & (y >= ymin) & (y <= ymax)
+        else:
+            px, py, r2 = circle
+            inside = (x - px) ** 2 + (y - py) ** 2 <= r2
+        return np.sort(self._ids[cells[inside]])
+
+    def nearest_many(self, points: PointArray | Iterable[Point], k: int = 1) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Busca los `k` puntos más cercanos a cada uno de `points`.
+
+        Devuelve dos arrays de forma (número de consultas, k) con las
+        distancias y las posiciones en la colección original.
+        """
+        if k < 1:
+            raise ValueError("k debe ser al menos 1")
+        if not isinstance(points, PointArray):
+            points = PointArray.from_points(points)
+        k = min(k, len(self._ids))
+        distances = np.empty((len(points), k))
+        indices = np.empty((len(points), k), dtype=np.intp)
+        for row, (px, py) in enumerate(zip(points.x.tolist(), points.y.tolist())):
+            heap = []
+            self._nearest(0, len(self._ids), px, py, k, heap)
+            heap.sort(reverse=True)
+            distances[row] = [math.sqrt(-d2) for d2, _ in heap]
+            indices[row] = [i for _, i in heap]
+        return distances, indices
+
+    def within_many(self, points: PointArray | Iterable[Point], radius: float) -> list[np.ndarray]:
+        """
+        Busca, para cada uno de `points`, los puntos a una distancia menor o
+        igual que `radius`.
+        """
+        if not isinstance(points, PointArray):
+            points = PointArray.from_points(points)
+        return [self.within(point, radius) for point in points]
@@ -0,0 +1,128 @@
+from geom2d.Point import Point
+from geom2d.VectorArray import VectorArray
+from typing import Iterable, Self
+import numpy as np
+
+
+class PointArray:
+    """
+    Representa una colección de puntos en un espacio bidimensional, guardada
+    por columnas en un array contiguo de NumPy (float64).
+
+    Admite las mismas operaciones que `Point`, aplicadas a todos los puntos a
+    la vez: el operando puede ser otro `PointArray` de la misma longitud o un
+    `Point`, que se aplica a todos.
+    """
+
+    # NumPy no debe tratar la colección como un escalar en sus operaciones.
+    __array_ufunc__ = None
+
+    def __init__(self, x: Iterable[float], y: Iterable[float]):
+        """
+        Inicializa la colección con las coordenadas x e y de cada punto.
+        """
+        x = np.asarray(x, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64)
+        if x.ndim != 1 or x.shape != y.shape:
+            raise ValueError("Las coordenadas x e y deben ser secuencias de la misma longitud")
+        self._xy = np.stack((x, y))
+
+    @classmethod
+    def from_points(cls, points: Iterable[Point]) -> Self:
+        """
+        Crea la colección a partir de objetos `Point`.
+        """
+        points = list(points)
+        return cls([p.x for p in points], [p.y for p in points])
+
+    def to_points(self) -> list[Point]:
+        """
+        Convierte la colección en una lista de objetos `Point`.
+        """
+        return [Point(x, y) for x, y in zip(self._xy[0].tolist(), self._xy[1].tolist())]
+
+    @property
+    def x(self) -> np.ndarray:
+        """
+        Obtiene la coordenada X de los puntos.
+        """
+        return self._xy[0]
+
+    @property
+    def y(self) -> np.ndarray:
+        """
+        Obtiene la coordenada Y de los puntos.
+        """
+        return self._xy[1]
+
+    def _coordinates(self, other) -> tuple:
+        """
+        Obtiene las coordenadas del otro operando, o None si no es un punto.
+        """
+        if isinstance(other, PointArray):
+            if len(other) != len(self):
+                raise ValueError(f"Las colecciones deben tener la misma longitud: {len(self)} != {len(other)}")
+            return other.x, other.y
+        if isinstance(other, Point):
+            return other.x, other.y
+        return None
+
+    def __len__(self) -> int:
+        """
+        Número de puntos de la colección.
+        """
+        return self._xy.shape[1]
+
+    def __getitem__(self, index):
+        """
+        Obtiene un `Point` (con un índice entero) o una colección (con un
+        slice, una máscara o una lista de índices).
+        """
+        if isinstance(index, (int, np.integer)):
+            return Point(self._xy[0, index].item(), self._xy[1, index].item())
+        return PointArray(self._xy[0, index], self._xy[1, index])
+
+    def __iter__(self):
+        """
+        Recorre los puntos como objetos `Point`.
+        """
+        return iter(self.to_points())
+
+    def __eq__(self, other) -> np.ndarray:
+        """
+        Compara cada punto con el otro operando; devuelve un array de bool.
+        """
+        coordinates = self._coordinates(other)
+        if coordinates is None:
+            return NotImplemented
+        x, y = coordinates
+        return (self.x == x) & (self.y == y)
+
+    def __sub__(self, other) -> VectorArray:
+        """
+        Define la resta de cada punto con el otro operando, resultando en los
+        vectores que van desde el otro operando hasta cada punto.
+        """
+        coordinates = self._coordinates(other)
+        if coordinates is None:
+            raise TypeError("La resta solo se puede ejecutar con un objeto de tipo Point o PointArray")
+        x, y = coordinates
+        return VectorArray(self.x - x, self.y - y)
+
+    def distance(self, other) -> np.ndarray:
+        """
+        Calcula la distancia euclidiana de cada punto hasta el otro operando.
+        """
+        coordinates = self._coordinates(other)
+        if coordinates is None:
+            raise ValueError("El parámetro debe ser una instancia de la clase Point o PointArray")
+        x, y = coordinates
+        return np.sqrt((self.x - x) ** 2 + (self.y - y) ** 2)
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        """
+        Representación formal de la colección.
+        """
+        return f"PointArray(x={self.x.tolist()}, y={self.y.tolist()})"
@@ -0,0 +1,124 @@
+from geom2d.Point import Point
+from geom2d.SlottedVector import SlottedVector
+from typing import Self
+import math
+
+
+class SlottedPoint:
+    """
+    Representa un punto en un espacio bidimensional, como `Point`, pero con
+    `__slots__` (sin `__dict__` por instancia) y guardando el hash la primera
+    vez que se calcula (los setters lo invalidan).
+
+    El hash es el mismo que el de un `Point` con las mismas coordenadas y la
+    igualdad funciona en los dos sentidos. La resta y `distance` de un
+    `SlottedPoint` admiten un `Point` como operando, pero las de `Point` solo
+    admiten otro `Point`: en las operaciones mixtas el `SlottedPoint` debe ir
+    a la izquierda.
+    """
+
+    __slots__ = ('_x', '_y', '_hash')
+
+    def __init__(self, x: float, y: float):
+        """
+        Inicializa un nuevo punto en las coordenadas x e y.
+        """
+        self._x = x
+        self._y = y
+        self._hash = None
+
+    @property
+    def x(self):
+        """
+        Obtiene la coordenada X del punto.
+        """
+        return self._x
+
+    @property
+    def y(self):
+        """
+        Obtiene la coordenada Y del punto.
+        """
+        return self._y
+
+    @x.setter
+    def x(self, new_x):
+        """
+        Establece un nuevo valor para la coordenada X del punto.
+        """
+        self._x = new_x
+        self._hash = None
+
+    @y.setter
+    def y(self, new_y):
+        """
+        Establece un nuevo valor para la coordenada Y del punto.
+        """
+        self._y = new_y
+        self._hash = None
+
+    def __hash__(self):
+        """
+        Genera un valor hash único para este punto.
+        """
+        h = self._hash
+        if h is None:
+            h = self._hash = hash((self._x, self._y))
+        return h
+
+    def __eq__(self, other: Self | Point) -> bool:
+        """
+        Compara este punto con otro para verificar si son iguales.
+        """
+        return self._x == other.x and self._y == other.y
+
+    def __sub__(self, other: Self | Point) -> SlottedVector:
+        """
+        Define la resta de dos puntos, resultando en un vector.
+        """
+        if not isinstance(other, (SlottedPoint, Point)):
+            raise TypeError("La resta solo se puede ejecutar con otro objeto de tipo Point")
+        return SlottedVector(self._x - other.x, self._y - other.y)
+
+    def distance(self, other: Self | Point) -> float:
+        """
+        Calcula la distancia euclidiana hasta otro punto.
+        """
+        if isinstance(other, (SlottedPoint, Point)):
+            return math.hypot(self._x - other.x, self._y - other.y)
+        else:
+            raise ValueError("El parámetro debe ser una instancia de la clase Point")
+
+    def __str__(self):
+        """
+        Representación informal del punto como cadena de texto.
+        """
+        return f"Objeto de la clase SlottedPoint con parámetros (x={self._x}, y={self._y})"
+
+    def __repr__(self):
+        """
+        Representación formal del punto.
+        """
+        return f"SlottedPoint(x={self._x}, y={self._y})"
+
+
+class FrozenPoint(SlottedPoint):
+    """
+    Variante inmutable de `SlottedPoint`: sus coordenadas no se pueden cambiar.
+    """
+
+    __slots__ = ()
+
+    @SlottedPoint.x.setter
+    def x(self, new_x):
+        raise AttributeError("Las coordenadas de un FrozenPoint no se pueden cambiar")
+
+    @SlottedPoint.y.setter
+    def y(self, new_y):
+        raise AttributeError("Las coordenadas de un FrozenPoint no se pueden cambiar")
+
+    def __repr__(self):
+        """
+        Representación formal del punto.
+        """
+        return f"FrozenPoint(x={self._x}, y={self._y})"
@@ -0,0 +1,136 @@
+from geom2d.Vector import Vector
+from typing import Self
+import math
+
+
+class SlottedVector:
+    """
+    Representa un vector en un espacio bidimensional, como `Vector`, pero
+    con `__slots__` (sin `__dict__` por instancia), inmutable y guardando el
+    hash y el cuadrado del módulo la primera vez que se calculan.
+
+    Las comparaciones de tamaño usan el cuadrado del módulo, sin raíz
+    cuadrada. El hash es el mismo que el de un `Vector` con las mismas
+    componentes, y ambos tipos se pueden comparar y operar entre sí.
+    """
+
+    __slots__ = ('_x', '_y', '_hash', '_mod2')
+
+    def __init__(self, x: float, y: float):
+        """
+        Inicializa un nuevo vector con las componentes x e y.
+        """
+        self._x = x
+        self._y = y
+        self._hash = None
+        self._mod2 = None
+
+    @property
+    def x(self) -> float:
+        """
+        Obtiene la componente X del vector.
+        """
+        return self._x
+
+    @property
+    def y(self) -> float:
+        """
+        Obtiene la componente Y del vector.
+        """
+        return self._y
+
+    @property
+    def mod2(self) -> float:
+        """
+        Obtiene el cuadrado del módulo del vector.
+        """
+        mod2 = self._mod2
+        if mod2 is None:
+            mod2 = self._mod2 = self._x * self._x + self._y * self._y
+        return mod2
+
+    @property
+    def mod(self) -> float:
+        """
+        Calcula el módulo (longitud) del vector.
+        """
+        return math.hypot(self._x, self._y)
+
+    def __eq__(self, other: Self | Vector) -> bool:
+        """
+        Compara este vector con otro para verificar si son iguales.
+        """
+        return self._x == other.x and self._y == other.y
+
+    @staticmethod
+    def _squared_mod(other: Self | Vector) -> float:
+        """
+        Obtiene el cuadrado del módulo del otro operando, guardado si es un
+        `SlottedVector` y calculado si es un `Vector`.
+        """
+        if isinstance(other, SlottedVector):
+            return other.mod2
+        return other.x * other.x + other.y * other.y
+
+    def __le__(self, other: Self | Vector) -> bool:
+        """
+        Verifica si este vector es menor o igual en módulo que otro vector.
+        """
+        return self.mod2 <= self._squared_mod(other)
+
+    def __lt__(self, other: Self | Vector) -> bool:
+        """
+        Verifica si este vector es menor en módulo que otro vector.
+        """
+        return self.mod2 < self._squared_mod(other)
+
+    def __hash__(self):
+        """
+        Genera un valor hash único para este vector.
+        """
+        h = self._hash
+        if h is None:
+            h = self._hash = hash((self._x, self._y, "vector"))
+        return h
+
+    def __add__(self, other: Self | Vector) -> Self:
+        """
+        Define la suma de este vector con otro.
+        """
+        return SlottedVector(self._x + other.x, self._y + other.y)
+
+    def __sub__(self, other: Self | Vector) -> Self:
+        """
+        Define la resta de este valor con otro.
+        """
+        return SlottedVector(self._x - other.x, self._y - other.y)
+
+    def __neg__(self) -> Self:
+        """
+        Define el vector opuesto (negativo) de este vector.
+        """
+        return SlottedVector(-self._x, -self._y)
+
+    def __mul__(self, other: Self | Vector) -> float:
+        """
+        Define el producto escalar de este vector con otro.
+        """
+        return self._x * other.x + self._y * other.y
+
+    def __rmul__(self, scalar: float) -> Self:
+        """
+        Define la multiplicación de este vector por un escalar.
+        """
+        return SlottedVector(scalar * self._x, scalar * self._y)
+
+    def __repr__(self) -> str:
+        """
+        Representación formal del vector.
+        """
+        return f"SlottedVector({self._x}, {self._y})"
+
+    def __str__(self) -> str:
+        """
+        Representación informal del vector como cadena de texto.
+        """
+        return f"({self._x:.4f}, {self._y:.4f})"
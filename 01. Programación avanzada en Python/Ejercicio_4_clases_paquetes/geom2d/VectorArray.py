@@ -0,0 +1,164 @@
+from geom2d.Vector import Vector
+from typing import Iterable, Self
+import numpy as np
+
+
+class VectorArray:
+    """
+    Representa una colección de vectores en un espacio bidimensional,
+    guardada por columnas en un array contiguo de NumPy (float64).
+
+    Admite las mismas operaciones que `Vector`, aplicadas a todos los vectores
+    a la vez: el operando puede ser otro `VectorArray` de la misma longitud o
+    un `Vector`, que se aplica a todos.
+    """
+
+    # NumPy no debe tratar la colección como un escalar en sus operaciones:
+    # así `array * vectores` llega a `__rmul__`.
+    __array_ufunc__ = None
+
+    def __init__(self, x: Iterable[float], y: Iterable[float]):
+        """
+        Inicializa la colección con las componentes x e y de cada vector.
+        """
+        x = np.asarray(x, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64)
+        if x.ndim != 1 or x.shape != y.shape:
+            raise ValueError("Las componentes x e y deben ser secuencias de la misma longitud")
+        self._xy = np.stack((x, y))
+
+    @classmethod
+    def from_vectors(cls, vectors: Iterable[Vector]) -> Self:
+        """
+        Crea la colección a partir de objetos `Vector`.
+        """
+        vectors = list(vectors)
+        return cls([v.x for v in vectors], [v.y for v in vectors])
+
+    def to_vectors(self) -> list[Vector]:
+        """
+        Convierte la colección en una lista de objetos `Vector`.
+        """
+        return [Vector(x, y) for x, y in zip(self._xy[0].tolist(), self._xy[1].tolist())]
+
+    @property
+    def x(self) -> np.ndarray:
+        """
+        Obtiene la componente X de los vectores.
+        """
+        return self._xy[0]
+
+    @property
+    def y(self) -> np.ndarray:
+        """
+        Obtiene la componente Y de los vectores.
+        """
+        return self._xy[1]
+
+    @property
+    def mod(self) -> np.ndarray:
+        """
+        Calcula el módulo (longitud) de cada vector.
+        """
+        return np.sqrt(self.x ** 2 + self.y ** 2)
+
+    def _components(self, other) -> tuple:
+        """
+        Obtiene las componentes del otro operando, o None si no es un vector.
+        """
+        if isinstance(other, VectorArray):
+            if len(other) != len(self):
+                raise ValueError(f"Las colecciones deben tener la misma longitud: {len(self)} != {len(other)}")
+            return other.x, other.y
+        if isinstance(other, Vector):
+            return other.x, other.y
+        return None
+
+    def _operand(self, other) -> tuple:
+        """
+        Obtiene las componentes del otro operando de una operación.
+        """
+        components = self._components(other)
+        if components is None:
+            raise TypeError("La operación solo se puede ejecutar con un objeto de tipo Vector o VectorArray")
+        return components
+
+    def __len__(self) -> int:
+        """
+        Número de vectores de la colección.
+        """
+        return self._xy.shape[1]
+
+    def __getitem__(self, index):
+        """
+        Obtiene un `Vector` (con un índice entero) o una colección (con un
+        slice, una máscara o una lista de índices).
+        """
+        if isinstance(index, (int, np.integer)):
+            return Vector(self._xy[0, index].item(), self._xy[1, index].item())
+        return VectorArray(self._xy[0, index], self._xy[1, index])
+
+    def __iter__(self):
+        """
+        Recorre los vectores como objetos `Vector`.
+        """
+        return iter(self.to_vectors())
+
+    def __eq__(self, other) -> np.ndarray:
+        """
+        Compara cada vector con el otro operando; devuelve un array de bool.
+        """
+        components = self._components(other)
+        if components is None:
+            return NotImplemented
+        x, y = components
+        return (self.x == x) & (self.y == y)
+
+    def __le__(self, other) -> np.ndarray:
+        """
+        Verifica si cada vector es menor o igual en módulo que el otro operando.
+        """
+        self._operand(other)
+        return self.mod <= other.mod
+
+    def __add__(self, other) -> Self:
+        """
+        Define la suma de cada vector con el otro operando.
+        """
+        x, y = self._operand(other)
+        return VectorArray(self.x + x, self.y + y)
+
+    def __sub__(self, other) -> Self:
+        """
+        Define la resta de cada vector con el otro operando.
+        """
+        x, y = self._operand(other)
+        return VectorArray(self.x - x, self.y - y)
+
+    def __neg__(self) -> Self:
+        """
+        Define los vectores opuestos.
+        """
+        return VectorArray(-self.x, -self.y)
+
+    def __mul__(self, other) -> np.ndarray:
+        """
+        Define el producto escalar de cada vector con el otro operando.
+        """
+        x, y = self._operand(other)
+        return self.x * x + self.y * y
+
+    def __rmul__(self, scalar) -> Self:
+        """
+        Define la multiplicación de cada vector por un escalar (o por un
+        array de escalares, uno por vector).
+        """
+        return VectorArray(scalar * self.x, scalar * self.y)
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        """
+        Representación formal de la colección.
+        """
+        return f"VectorArray(x={self.x.tolist()}, y={self.y.tolist()})"
@@ -0,0 +1,277 @@
+"""
+Micro-benchmarks de las operaciones de geom2d, escalares y por lotes, con
+varios tamaños de entrada.
+
+De cada caso se guarda el tiempo por ejecución (mínimo y mediana de varias
+repeticiones) y la memoria de una ejecución (el pico reservado y lo que
+ocupa el resultado, medidos con `tracemalloc`). Los resultados se escriben
+en JSON y se pueden comparar con los de otra ejecución: la comparación
+falla si algún caso es más lento que el umbral configurado.
+
+Uso:
+    python -m geom2d.benchmark --output actual.json
+    python -m geom2d.benchmark --compare base.json --threshold 1.25
+"""
+from geom2d.KDTree import KDTree
+from geom2d.Point import Point
+from geom2d.PointArray import PointArray
+from geom2d.SlottedPoint import SlottedPoint
+from geom2d.SlottedVector import SlottedVector
+from geom2d.Vector import Vector
+from geom2d.VectorArray import VectorArray
+from geom2d.distance_matrix import distance_matrix
+from typing import Callable
+import argparse
+import json
+import platform
+import random
+import statistics
+import sys
+import time
+import timeit
+import tracemalloc
+import numpy as np
+
+DEFAULT_SIZES = (100, 10_000)
+
+# nombre del caso -> (función que prepara el caso para un tamaño, tamaños)
+BENCHMARKS: dict[str, tuple[Callable[[int], Callable[[], object]], tuple[int, ...]]] = {}
+
+
+def benchmark(name: str, sizes: tuple[int, ...] = DEFAULT_SIZES):
+    """
+    Registra un caso. La función decorada recibe el tamaño de la entrada,
+    prepara los datos y devuelve la función (sin argumentos) que se mide.
+    """
+    def register(setup: Callable[[int], Callable[[], object]]):
+        BENCHMARKS[name] = (setup, sizes)
+        return setup
+    return register
+
+
+def _coordinates(n: int) -> list[tuple[float, float]]:
+    rng = random.Random(n)
+    return [(rng.uniform(-100, 100), rng.uniform(-100, 100)) for _ in range(n)]
+
+
+def _pairs(cls, n: int) -> tuple[list, list]:
+    coordinates = _coordinates(n)
+    return [cls(x, y) for x, y in coordinates], [cls(y, x) for x, y in coordinates]
+
+
+@benchmark('point.sub')
+def _point_sub(n: int):
+    a, b = _pairs(Point, n)
+    return lambda: [p - q for p, q in zip(a, b)]
+
+
+@benchmark('point.distance')
+def _point_distance(n: int):
+    a, b = _pairs(Point, n)
+    return lambda: [p.distance(q) for p, q in zip(a, b)]
+
+
+@benchmark('point.hash')
+def _point_hash(n: int):
+    a, _ = _pairs(Point, n)
+    return lambda: [hash(p) for p in a]
+
+
+@benchmark('point.eq')
+def _point_eq(n: int):
+    a, b = _pairs(Point, n)
+    return lambda: [p == q for p, q in zip(a, b)]
+
+
+@benchmark('vector.add')
+def _vector_add(n: int):
+    a, b = _pairs(Vector, n)
+    return lambda: [v + w for v, w in zip(a, b)]
+
+
+@benchmark('vector.mod')
+def _vector_mod(n: int):
+    a, _ = _pairs(Vector, n)
+    return lambda: [v.mod for v in a]
+
+
+@benchmark('vector.hash')
+def _vector_hash(n: int):
+    a, _ = _pairs(Vector, n)
+    return lambda: [hash(v) for v in a]
+
+
+@benchmark('vector.eq')
+def _vector_eq(n: int):
+    a, b = _pairs(Vector, n)
+    return lambda: [v == w for v, w in zip(a, b)]
+
+
+@benchmark('slotted_vector.mod')
+def _slotted_vector_mod(n: int):
+    a, _ = _pairs(SlottedVector, n)
+    return lambda: [v.mod for v in a]
+
+
+@benchmark('slotted_vector.hash')
+def _slotted_vector_hash(n: int):
+    a, _ = _pairs(SlottedVector, n)
+    return lambda: [hash(v) for v in a]
+
+
+@benchmark('slotted_point.distance')
+def _slotted_point_distance(n: int):
+    a, b = _pairs(SlottedPoint, n)
+    return lambda: [p.distance(q) for p, q in zip(a, b)]
+
+
+@benchmark('point_array.sub', sizes=(100, 10_000, 1_000_000))
+def _point_array_sub(n: int):
+    a, b = (PointArray.from_points(points) for points in _pairs(Point, n))
+    return lambda: a - b
+
+
+@benchmark('point_array.distance', sizes=(100, 10_000, 1_000_000))
+def _point_array_distance(n: int):
+    a, b = (PointArray.from_points(points) for points in _pairs(Point, n))
+    return lambda: a.distance(b)
+
+
+@benchmark('vector_array.add', sizes=(100, 10_000, 1_000_000))
+def _vector_array_add(n: int):
+    a, b = (VectorArray.from_vectors(vectors) for vectors in _pairs(Vector, n))
+    return lambda: a + b
+
+
+@benchmark('vector_array.mod', sizes=(100, 10_000, 1_000_000))
+def _vector_array_mod(n: int):
+    a, _ = (VectorArray.from_vectors(vectors) for vectors in _pairs(Vector, n))
+    return lambda: a.mod
+
+
+@benchmark('distance_matrix', sizes=(100, 1_000))
+def _distance_matrix(n: int):
+    a, _ = _pairs(Point, n)
+    points = PointArray.from_points(a)
+    return lambda: distance_matrix(points)
+
+
+@benchmark('kdtree.nearest_many', sizes=(1_000, 100_000))
+def _kdtree_nearest(n: int):
+    a, b = _pairs(Point, n)
+    tree = KDTree(a)
+    queries = PointArray.from_points(b[:1000])
+    return lambda: tree.nearest_many(queries, k=5)
+
+
+def measure(run: Callable[[], object], repeat: int = 5, min_time: float = 0.05) -> dict[str, float]:
+    """
+    Mide una función: tiempo por ejecución (mínimo y mediana de `repeat`
+    repeticiones de al menos `min_time` segundos) y memoria de una ejecución
+    medida con `tracemalloc`: el pico de bytes reservados durante la
+    ejecución y los bytes que ocupa su resultado.
+    """
+    timer = timeit.Timer(run)
+    number = _calibrate(timer, min_time)
+    times = [t / number for t in timer.repeat(repeat=repeat, number=number)]
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        result = run()
+        after, peak = tracemalloc.get_traced_memory()
+        del result
+    finally:
+        tracemalloc.stop()
+    return {'min': min(times), 'median': statistics.median(times), 'number': number,
+            'peak_bytes': peak - before, 'result_bytes': after - before}
+
+
+def _calibrate(timer: timeit.Timer, min_time: float) -> int:
+    """
+    Número de ejecuciones necesarias para que una repetición dure al menos
+    `min_time` segundos (como `timeit.Timer.autorange`).
+    """
+    number = 1
+    while True:
+        elapsed = timer.timeit(number)
+        if elapsed >= min_time:
+            return number
+        number *= 2 if elapsed == 0 else max(2, min(10, int(min_time / elapsed) + 1))
+
+
+def run(names: list[str] | None = None, sizes: list[int] | None = None, repeat: int = 5,
+        min_time: float = 0.05) -> dict:
+    """
+    Ejecuta los casos registrados (todos o los que contienen alguno de
+    `names`), con sus tamaños o con los de `sizes`, y devuelve los resultados
+    en un diccionario serializable a JSON: 'meta' con la descripción de la
+    máquina y 'results' con un elemento por caso y tamaño ('nombre[n]').
+    """
+    results = {}
+    for name, (setup, default_sizes) in BENCHMARKS.items():
+        if names and not any(pattern in name for pattern in names):
+            continue
+        for n in sizes or default_sizes:
+            results[f'{name}[{n}]'] = {'name': name, 'size': n, **measure(setup(n), repeat, min_time)}
+    meta = {'python': platform.python_version(), 'implementation': platform.python_implementation(),
+            'numpy': np.__version__, 'machine': platform.machine(), 'system': platform.system(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z')}
+    return {'meta': meta, 'results': results}
+
+
+def compare(baseline: dict, current: dict, threshold: float = 1.25) -> list[dict]:
+    """
+    Compara dos resultados de `run` (por el tiempo mínimo de cada caso) y
+    devuelve los casos comunes que son más de `threshold` veces más lentos.
+    """
+    regressions = []
+    for key, result in current['results'].items():
+        base = baseline['results'].get(key)
+        if base is None or base['min'] <= 0:
+            continue
+        ratio = result['min'] / base['min']
+        if ratio > threshold:
+            regressions.append({'case': key, 'baseline': base['min'], 'current': result['min'], 'ratio': ratio})
+    return regressions
+
+
+def _format(results: dict) -> str:
+    lines = [f"{'caso':<36}{'mín. (µs)':>14}{'mediana (µs)':>14}{'pico (KiB)':>12}"]
+    for key, result in results['results'].items():
+        lines.append(f"{key:<36}{result['min'] * 1e6:>14.2f}{result['median'] * 1e6:>14.2f}"
+                     f"{result['peak_bytes'] / 1024:>12.1f}")
+    return '\n'.join(lines)
+
+
+def main(argv: list[str] | None = None) -> int:
+    """
+    Línea de órdenes: ejecuta los casos, muestra una tabla, guarda el JSON y,
+    si se da una ejecución de referencia, devuelve 1 si hay regresiones.
+    """
+    parser = argparse.ArgumentParser(prog='python -m geom2d.benchmark', description=__doc__.split('\n\n')[0])
+    parser.add_argument('-k', '--filter', action='append', help='ejecutar solo los casos que contienen el texto')
+    parser.add_argument('--sizes', type=int, nargs='+', help='tamaños de entrada (por defecto, los de cada caso)')
+    parser.add_argument('--repeat', type=int, default=5, help='repeticiones de cada medida')
+    parser.add_argument('--min-time', type=float, default=0.05, help='segundos mínimos de cada repetición')
+    parser.add_argument('-o', '--output', help='fichero JSON donde guardar los resultados')
+    parser.add_argument('--compare', help='fichero JSON de una ejecución de referencia')
+    parser.add_argument('--threshold', type=float, default=1.25,
+                        help='máxima relación de tiempos admitida respecto a la referencia')
+    args = parser.parse_args(argv)
+    results = run(args.filter, args.sizes, args.repeat, args.min_time)
+    print(_format(results))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(json.load(f), results, args.threshold)
+        for regression in regressions:
+            print(f"REGRESIÓN {regression['case']}: {regression['baseline'] * 1e6:.2f} µs -> "
+                  f"{regression['current'] * 1e6:.2f} µs (x{regression['ratio']:.2f})", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
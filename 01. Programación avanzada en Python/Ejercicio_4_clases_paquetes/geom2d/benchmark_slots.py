@@ -0,0 +1,72 @@
+"""
+Compara la memoria por instancia y el tiempo de las operaciones más usadas
+de `Point`/`Vector` con sus variantes `SlottedPoint`/`SlottedVector`.
+
+Uso: python -m geom2d.benchmark_slots
+"""
+from geom2d.Point import Point
+from geom2d.SlottedPoint import SlottedPoint
+from geom2d.SlottedVector import SlottedVector
+from geom2d.Vector import Vector
+import functools
+import random
+import timeit
+import tracemalloc
+
+
+def instance_size(cls, n: int = 100_000) -> float:
+    """
+    Bytes reservados por instancia al crear `n` objetos de la clase.
+    """
+    coordinates = [(float(i), float(-i)) for i in range(n)]
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    objects = [cls(x, y) for x, y in coordinates]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del objects
+    # se descuenta la lista que guarda los objetos
+    return (after - before) / n - 8
+
+
+def _compare(a, b) -> int:
+    """
+    Compara dos vectores usando solo `<=`, el único orden que define `Vector`.
+    """
+    if a <= b:
+        return 0 if b <= a else -1
+    return 1
+
+
+def operation_times(vector_cls, point_cls, n: int = 10_000, repeat: int = 5) -> dict[str, float]:
+    """
+    Mejor tiempo (en segundos) de cada operación sobre `n` objetos.
+    """
+    rng = random.Random(0)
+    coordinates = [(rng.uniform(-100, 100), rng.uniform(-100, 100)) for _ in range(n)]
+    vectors = [vector_cls(x, y) for x, y in coordinates]
+    points = [point_cls(x, y) for x, y in coordinates]
+    origin = point_cls(0.0, 0.0)
+    operations = {
+        'hash': lambda: [hash(v) for v in vectors],
+        'set': lambda: set(vectors),
+        'sort': lambda: sorted(vectors, key=functools.cmp_to_key(_compare)),
+        'mod': lambda: [v.mod for v in vectors],
+        'distance': lambda: [p.distance(origin) for p in points],
+    }
+    return {name: min(timeit.repeat(operation, number=1, repeat=repeat)) for name, operation in operations.items()}
+
+
+def main() -> None:
+    print(f"{'bytes/instancia':<16}{'dict':>10}{'slots':>10}")
+    for name, base, slotted in (('Vector', Vector, SlottedVector), ('Point', Point, SlottedPoint)):
+        print(f"{name:<16}{instance_size(base):>10.0f}{instance_size(slotted):>10.0f}")
+    base = operation_times(Vector, Point)
+    slotted = operation_times(SlottedVector, SlottedPoint)
+    print(f"\n{'ms (10000 obj.)':<16}{'dict':>10}{'slots':>10}{'mejora':>10}")
+    for name in base:
+        print(f"{name:<16}{base[name] * 1000:>10.2f}{slotted[name] * 1000:>10.2f}{base[name] / slotted[name]:>9.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+from geom2d.Point import Point
+from geom2d.PointArray import PointArray
+from typing import Iterable
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0088
+
+
+def _as_array(points: PointArray | Iterable[Point]) -> PointArray:
+    """
+    Convierte una colección de puntos en un `PointArray` (si no lo es ya).
+    """
+    return points if isinstance(points, PointArray) else PointArray.from_points(points)
+
+
+def _block_distances(ax: np.ndarray, ay: np.ndarray, b: tuple, metric: str, radius: float,
+                     out: np.ndarray, first: np.ndarray, second: np.ndarray) -> None:
+    """
+    Escribe en `out` las distancias de un bloque de filas (`ax`, `ay`) a todos
+    los puntos de `b`, usando `first` y `second` como memoria temporal.
+    """
+    if metric == 'euclidean':
+        bx, by = b
+        np.subtract.outer(ax, bx, out=first)
+        np.multiply(first, first, out=first)
+        np.subtract.outer(ay, by, out=second)
+        np.multiply(second, second, out=second)
+        np.add(first, second, out=first)
+        np.sqrt(first, out=out, casting='same_kind')
+    else:
+        # haversine con las coordenadas ya en radianes: x longitud, y latitud
+        blon, blat, bcos = b
+        np.subtract.outer(ay, blat, out=first)
+        np.sin(np.multiply(first, 0.5, out=first), out=first)
+        np.multiply(first, first, out=first)
+        np.subtract.outer(ax, blon, out=second)
+        np.sin(np.multiply(second, 0.5, out=second), out=second)
+        np.multiply(second, second, out=second)
+        np.multiply(second, np.cos(ay)[:, None], out=second)
+        np.multiply(second, bcos, out=second)
+        np.add(first, second, out=first)
+        np.minimum(first, 1.0, out=first)
+        np.sqrt(first, out=first)
+        np.arcsin(first, out=first)
+        np.multiply(first, 2.0 * radius, out=out, casting='same_kind')
+
+
+def _prepare(points: PointArray, metric: str) -> tuple:
+    """
+    Coordenadas de los puntos preparadas para `_block_distances`.
+    """
+    if metric == 'euclidean':
+        return points.x, points.y
+    if metric == 'haversine':
+        lon, lat = np.radians(points.x), np.radians(points.y)
+        return lon, lat, np.cos(lat)
+    raise ValueError(f"Métrica desconocida {metric!r}, debe ser 'euclidean' o 'haversine'")
+
+
+def distance_matrix(a: PointArray | Iterable[Point], b: PointArray | Iterable[Point] | None = None,
+                    metric: str = 'euclidean', dtype: type = np.float64, block_rows: int = 256,
+                    radius: float = EARTH_RADIUS_KM) -> np.ndarray:
+    """
+    Calcula la matriz de distancias entre dos colecciones de puntos: el
+    elemento (i, j) es la distancia del punto i de `a` al punto j de `b` (de
+    `a` a sí misma si no se da `b`).
+
+    La matriz se calcula por bloques de `block_rows` filas con operaciones de
+    NumPy, así que la memoria temporal es de `block_rows` x len(b) valores;
+    con `dtype=np.float32` el resultado ocupa la mitad (los cálculos se hacen
+    siempre en float64).
+
+    Con `metric='haversine'` las coordenadas son longitud (x) y latitud (y)
+    en grados, y las distancias son de círculo máximo sobre una esfera de
+    radio `radius` (en km por defecto).
+    """
+    a = _as_array(a)
+    b = a if b is None else _as_array(b)
+    if block_rows < 1:
+        raise ValueError("Los bloques deben tener al menos una fila")
+    pa, pb = _prepare(a, metric), _prepare(b, metric)
+    out = np.empty((len(a), len(b)), dtype=dtype)
+    rows = min(block_rows, len(a))
+    first, second = np.empty((rows, len(b))), np.empty((rows, len(b)))
+    for start in range(0, len(a), block_rows):
+        stop = min(start + block_rows, len(a))
+        n = stop - start
+        _block_distances(pa[0][start:stop], pa[1][start:stop], pb, metric, radius, out[start:stop],
+                         first[:n], second[:n])
+    return out
+
+
+def condensed_distances(points: PointArray | Iterable[Point], metric: str = 'euclidean',
+                        dtype: type = np.float64, block_rows: int = 256,
+                        radius: float = EARTH_RADIUS_KM) -> np.ndarray:
+    """
+    Calcula las distancias entre todos los pares de una colección sin
+    repetirlos: solo el triángulo superior de la matriz de distancias, fila a
+    fila (como `scipy.spatial.distance.pdist`), con n (n - 1) / 2 valores. La
+    distancia entre los puntos i < j está en la posición
+    n i - i (i + 1) / 2 + j - i - 1.
+
+    Se calcula por bloques de filas como `distance_matrix`, con las mismas
+    opciones.
+    """
+    points = _as_array(points)
+    if block_rows < 1:
+        raise ValueError("Los bloques deben tener al menos una fila")
+    n = len(points)
+    prepared = _prepare(points, metric)
+    out = np.empty(n * (n - 1) // 2, dtype=dtype)
+    rows = min(block_rows, n)
+    first, second = np.empty((rows, n)), np.empty((rows, n))
+    block = np.empty((rows, n), dtype=dtype)
+    for start in range(0, n, block_rows):
+        stop = min(start + block_rows, n)
+        # solo hacen falta las columnas a la derecha de la diagonal del bloque
+        width = n - start
+        columns = tuple(coordinate[start:] for coordinate in prepared)
+        _block_distances(prepared[0][start:stop], prepared[1][start:stop], columns, metric, radius,
+                         block[:stop - start, :width], first[:stop - start, :width], second[:stop - start, :width])
+        for i in range(start, stop):
+            offset = n * i - i * (i + 1) // 2
+            out[offset:offset + n - i - 1] = block[i - start, i - start + 1:width]
+    return out
@@ -0,0 +1,35 @@
+from geom2d import benchmark
+import json
+import pytest
+
+@pytest.fixture
+def mock_results() -> dict:
+    return benchmark.run(['point.eq', 'vector_array.add'], sizes=[10], repeat=2, min_time=0.001)
+
+def test_run(mock_results):
+    """
+    Cada caso y tamaño tiene sus tiempos y su memoria, y el resultado es JSON
+    """
+    assert set(mock_results['results']) == {'point.eq[10]', 'vector_array.add[10]'}
+    for result in mock_results['results'].values():
+        assert 0 < result['min'] <= result['median']
+        assert result['peak_bytes'] >= result['result_bytes'] > 0
+    assert json.loads(json.dumps(mock_results)) == mock_results
+
+@pytest.mark.parametrize("factor, expected", [(1.0, []), (2.0, ['point.eq[10]', 'vector_array.add[10]'])])
+def test_compare(mock_results, factor, expected):
+    slower = json.loads(json.dumps(mock_results))
+    for result in slower['results'].values():
+        result['min'] *= factor
+    assert [r['case'] for r in benchmark.compare(mock_results, slower, threshold=1.5)] == expected
+
+def test_main_fails_on_regression(tmp_path, mock_results):
+    baseline = tmp_path / "base.json"
+    for result in mock_results['results'].values():
+        result['min'] /= 100
+    baseline.write_text(json.dumps(mock_results))
+    args = ['-k', 'point.eq', '-k', 'vector_array.add', '--sizes', '10', '--repeat', '2', '--min-time', '0.001']
+    output = tmp_path / "current.json"
+    assert benchmark.main(args + ['-o', str(output), '--compare', str(baseline)]) == 1
+    assert set(json.loads(output.read_text())['results']) == set(mock_results['results'])
+    assert benchmark.main(args + ['--compare', str(output), '--threshold', '100']) == 0
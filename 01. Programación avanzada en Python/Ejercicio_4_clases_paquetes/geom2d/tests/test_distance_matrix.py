@@ -0,0 +1,48 @@
+from geom2d.Point import Point
+from geom2d.PointArray import PointArray
+from geom2d.distance_matrix import condensed_distances, distance_matrix
+import numpy as np
+import pytest
+
+@pytest.fixture
+def mock_points() -> list[Point]:
+    rng = np.random.default_rng(0)
+    return [Point(x, y) for x, y in rng.uniform(-50, 50, (37, 2)).tolist()]
+
+@pytest.mark.parametrize("block_rows", [1, 5, 256])
+def test_cross_matrix(mock_points, block_rows):
+    """
+    Cada elemento coincide con Point.distance, sea cual sea el tamaño de bloque
+    """
+    a, b = mock_points[:10], mock_points[10:]
+    result = distance_matrix(a, b, block_rows=block_rows)
+    expected = [[p.distance(q) for q in b] for p in a]
+    assert result.shape == (10, 27)
+    assert result.tolist() == [pytest.approx(row) for row in expected]
+
+@pytest.mark.parametrize("block_rows", [1, 4, 256])
+def test_condensed(mock_points, block_rows):
+    full = distance_matrix(mock_points)
+    condensed = condensed_distances(PointArray.from_points(mock_points), block_rows=block_rows)
+    rows, cols = np.triu_indices(len(mock_points), k=1)
+    assert np.array_equal(condensed, full[rows, cols])
+    assert np.allclose(np.diag(full), 0)
+
+def test_float32(mock_points):
+    result = distance_matrix(mock_points, dtype=np.float32)
+    assert result.dtype == np.float32
+    assert np.allclose(result, distance_matrix(mock_points), rtol=1e-6)
+    assert condensed_distances(mock_points, dtype=np.float32).dtype == np.float32
+
+def test_haversine():
+    """
+    Distancia de Londres a París (unos 343.5 km) con coordenadas (lon, lat)
+    """
+    london, paris = Point(-0.1278, 51.5074), Point(2.3522, 48.8566)
+    result = distance_matrix([london, paris], metric='haversine')
+    assert result[0, 1] == pytest.approx(343.5, abs=1)
+    assert result[0, 1] == result[1, 0] and result[0, 0] == 0
+    assert condensed_distances([london, paris], metric='haversine')[0] == pytest.approx(result[0, 1])
+
+    with pytest.raises(ValueError):
+        distance_matrix([london, paris], metric='manhattan')
@@ -0,0 +1,53 @@
+from geom2d.KDTree import KDTree
+from geom2d.Point import Point
+from geom2d.PointArray import PointArray
+import numpy as np
+import pytest
+
+@pytest.fixture
+def mock_points() -> PointArray:
+    rng = np.random.default_rng(0)
+    return PointArray(rng.uniform(-100, 100, 2000), rng.normal(0, 30, 2000))
+
+@pytest.fixture
+def mock_tree(mock_points) -> KDTree:
+    return KDTree(mock_points, leaf_size=8)
+
+@pytest.mark.parametrize("x, y, k", [(0, 0, 1), (50, -20, 5), (500, 500, 3)])
+def test_nearest(mock_points, mock_tree, x, y, k):
+    """
+    Los k vecinos coinciden con los de la búsqueda por fuerza bruta
+    """
+    distances, indices = mock_tree.nearest(Point(x, y), k)
+    expected = np.sort(mock_points.distance(Point(x, y)))[:k]
+    assert distances == pytest.approx(expected)
+    assert mock_points.distance(Point(x, y))[indices] == pytest.approx(expected)
+
+def test_within(mock_points, mock_tree):
+    result = mock_tree.within(Point(10, 5), 15)
+    expected = np.flatnonzero(mock_points.distance(Point(10, 5)) <= 15)
+    assert result.tolist() == expected.tolist()
+
+def test_in_bbox(mock_points, mock_tree):
+    result = mock_tree.in_bbox(-20, -10, 30, 40)
+    x, y = mock_points.x, mock_points.y
+    expected = np.flatnonzero((x >= -20) & (x <= 30) & (y >= -10) & (y <= 40))
+    assert result.tolist() == expected.tolist()
+    assert mock_tree.in_bbox(1000, 1000, 2000, 2000).tolist() == []
+
+def test_batched(mock_points, mock_tree):
+    queries = [Point(0, 0), Point(-80, 40), Point(99, -99)]
+    distances, indices = mock_tree.nearest_many(queries, k=4)
+    assert distances.shape == indices.shape == (3, 4)
+    for row, query in enumerate(queries):
+        assert indices[row].tolist() == mock_tree.nearest(query, 4)[1].tolist()
+    assert [r.tolist() for r in mock_tree.within_many(queries, 10)] == \
+        [mock_tree.within(q, 10).tolist() for q in queries]
+
+def test_from_point_objects():
+    points = [Point(0, 0), Point(1, 1), Point(2, 2), Point(1, 1)]
+    tree = KDTree(points, leaf_size=1)
+    assert len(tree) == 4
+    assert tree.nearest(Point(0.9, 1.2), k=2)[1].tolist() in ([1, 3], [3, 1])
+    with pytest.raises(ValueError):
+        tree.nearest(Point(0, 0), k=0)
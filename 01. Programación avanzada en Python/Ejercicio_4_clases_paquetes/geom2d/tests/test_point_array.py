@@ -0,0 +1,58 @@
+from geom2d.Point import Point
+from geom2d.PointArray import PointArray
+import numpy as np
+import pytest
+
+@pytest.fixture
+def mock_points() -> list[Point]:
+    return [Point(1, 1), Point(4, 5), Point(-2.5, 0.5)]
+
+@pytest.fixture
+def mock_point_array(mock_points) -> PointArray:
+    return PointArray.from_points(mock_points)
+
+def test_roundtrip(mock_points, mock_point_array):
+    """
+    La conversión desde y hacia una lista de puntos no pierde información
+    """
+    assert len(mock_point_array) == 3
+    assert mock_point_array.to_points() == mock_points
+    assert mock_point_array[1] == Point(4, 5)
+    assert list(mock_point_array[1:]) == mock_points[1:]
+
+def test_sub(mock_points, mock_point_array):
+    """
+    La resta de cada punto coincide con la resta de objetos Point
+    """
+    result = mock_point_array - Point(1, 2)
+    assert result.to_vectors() == [p - Point(1, 2) for p in mock_points]
+    result = mock_point_array - mock_point_array[::-1]
+    assert result.to_vectors() == [a - b for a, b in zip(mock_points, mock_points[::-1])]
+
+    with pytest.raises(TypeError):
+        mock_point_array - 123
+
+def test_distance(mock_points, mock_point_array):
+    """
+    La distancia de cada punto coincide con la distancia de objetos Point
+    """
+    result = mock_point_array.distance(Point(4, 5))
+    assert result.tolist() == pytest.approx([p.distance(Point(4, 5)) for p in mock_points])
+
+    with pytest.raises(ValueError):
+        mock_point_array.distance("string")
+    with pytest.raises(ValueError):
+        mock_point_array.distance(mock_point_array[:2])
+
+def test_equality(mock_point_array):
+    assert (mock_point_array == Point(4, 5)).tolist() == [False, True, False]
+    assert np.all(mock_point_array == PointArray.from_points(mock_point_array))
+    assert (mock_point_array == "string") is False
+    assert (np.zeros(3) == mock_point_array) is False
+
+def test_numpy_operand(mock_point_array):
+    """
+    NumPy no reparte la operación entre los elementos del array
+    """
+    with pytest.raises(TypeError):
+        np.zeros(3) - mock_point_array
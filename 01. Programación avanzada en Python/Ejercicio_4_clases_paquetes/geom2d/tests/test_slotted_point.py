@@ -0,0 +1,54 @@
+from geom2d.Point import Point
+from geom2d.SlottedPoint import FrozenPoint, SlottedPoint
+from geom2d.SlottedVector import SlottedVector
+import pytest
+import math
+
+@pytest.fixture
+def mock_point_1() -> SlottedPoint:
+    return SlottedPoint(1, 1)
+
+@pytest.fixture
+def mock_point_2() -> SlottedPoint:
+    return SlottedPoint(4, 5)
+
+def test_setter_invalidates_hash(mock_point_1):
+    assert hash(mock_point_1) == hash(Point(1, 1))
+    mock_point_1.x = 10
+    mock_point_1.y = 10
+    assert mock_point_1.x == 10 and mock_point_1.y == 10
+    assert hash(mock_point_1) == hash(Point(10, 10))
+
+def test_sub(mock_point_1, mock_point_2):
+    result = mock_point_1 - mock_point_2
+    assert isinstance(result, SlottedVector)
+    assert result.x == pytest.approx(-3, abs=1e-4)
+    assert result.y == pytest.approx(-4, abs=1e-4)
+    assert mock_point_1 - Point(4, 5) == result
+
+    with pytest.raises(TypeError):
+        mock_point_1 - 123
+
+def test_distance(mock_point_1, mock_point_2):
+    expected_distance = math.sqrt((4 -1) ** 2 + (5 - 1) ** 2)
+    assert mock_point_1.distance(mock_point_2) == pytest.approx(expected_distance, abs= 1e-4)
+
+    with pytest.raises(ValueError):
+        mock_point_1.distance("string")
+
+def test_mixed_with_point(mock_point_1):
+    """
+    Un SlottedPoint a la izquierda opera con un Point; Point solo admite Point
+    """
+    assert mock_point_1 == Point(1, 1) and Point(1, 1) == mock_point_1
+    assert mock_point_1 - Point(4, 5) == Point(1, 1) - Point(4, 5)
+    assert mock_point_1.distance(Point(4, 5)) == pytest.approx(5.0)
+    with pytest.raises(TypeError):
+        Point(4, 5) - mock_point_1
+
+def test_frozen():
+    p = FrozenPoint(1, 2)
+    assert not hasattr(p, "__dict__")
+    assert p == Point(1, 2) and len({p, FrozenPoint(1, 2)}) == 1
+    with pytest.raises(AttributeError):
+        p.x = 3
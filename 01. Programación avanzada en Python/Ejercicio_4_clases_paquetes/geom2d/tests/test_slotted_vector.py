@@ -0,0 +1,52 @@
+import pytest
+import math
+from geom2d.SlottedVector import SlottedVector
+from geom2d.Vector import Vector
+
+@pytest.mark.parametrize("x, y", [(3.0, 4.0), (-1.5, 0.0), (0.0, 0.0)])
+def test_matches_vector(x, y):
+    """
+    El hash, el módulo y la igualdad coinciden con los de Vector
+    """
+    v = SlottedVector(x, y)
+    assert hash(v) == hash(Vector(x, y)) and hash(v) == hash(v)
+    assert v.mod == pytest.approx(Vector(x, y).mod)
+    assert v.mod2 == x * x + y * y
+    assert v == Vector(x, y)
+
+def test_no_dict():
+    v = SlottedVector(1.0, 2.0)
+    assert not hasattr(v, "__dict__")
+    with pytest.raises(AttributeError):
+        v.x = 3.0
+
+@pytest.mark.parametrize("x1, y1, x2, y2, expected", [
+    (1.0, 2.0, 2.0, 1.0, True),
+    (3.0, 4.0, 1.0, 1.0, False),
+    (0.0, 0.0, 0.0, 0.0, True),
+])
+def test_compare_by_modulus(x1, y1, x2, y2, expected):
+    v1, v2 = SlottedVector(x1, y1), SlottedVector(x2, y2)
+    assert (v1 <= v2) == expected == (Vector(x1, y1) <= Vector(x2, y2))
+
+def test_sort_and_operations():
+    vectors = [SlottedVector(3.0, 4.0), SlottedVector(0.0, 1.0), SlottedVector(-2.0, 0.0)]
+    assert [v.mod for v in sorted(vectors)] == [1.0, 2.0, 5.0]
+    assert vectors[0] + vectors[1] == Vector(3.0, 5.0)
+    assert vectors[0] - vectors[1] == Vector(3.0, 3.0)
+    assert -vectors[0] == Vector(-3.0, -4.0)
+    assert vectors[0] * vectors[2] == -6.0
+    assert 2 * vectors[0] == Vector(6.0, 8.0)
+    assert vectors[0].mod == math.hypot(3.0, 4.0)
+
+def test_mixed_with_vector():
+    """
+    Las comparaciones y operaciones mezclan SlottedVector y Vector en los dos sentidos
+    """
+    slotted, plain = SlottedVector(1.0, 2.0), Vector(1.0, 2.0)
+    assert slotted <= plain and plain <= slotted
+    assert not slotted < plain and SlottedVector(0.0, 1.0) < plain
+    assert slotted == plain and plain == slotted
+    assert slotted + plain == plain + slotted == Vector(2.0, 4.0)
+    assert slotted - plain == plain - slotted == Vector(0.0, 0.0)
+    assert slotted * plain == plain * slotted == 5.0
@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+from geom2d.Vector import Vector
+from geom2d.VectorArray import VectorArray
+
+@pytest.fixture
+def create_vector_array():
+    """
+    Crea colecciones de vectores con los pares (x, y) introducidos
+    """
+    def _create_vector_array(*pairs):
+        return VectorArray.from_vectors(Vector(x, y) for x, y in pairs)
+    return _create_vector_array
+
+PAIRS_1 = [(-1.0, -2.0), (0.0, 0.0), (5.0, -3.0)]
+PAIRS_2 = [(3.0, 4.0), (-1.0, -1.0), (-2.0, 3.0)]
+
+def test_roundtrip(create_vector_array):
+    vectors = create_vector_array(*PAIRS_1)
+    assert vectors.to_vectors() == [Vector(x, y) for x, y in PAIRS_1]
+    assert vectors[2] == Vector(5.0, -3.0)
+
+@pytest.mark.parametrize("operation", [
+    lambda a, b: a + b,
+    lambda a, b: a - b,
+    lambda a, b: a * b,
+    lambda a, b: a <= b,
+    lambda a, b: a == b,
+])
+def test_operations_match_vector(create_vector_array, operation):
+    """
+    Cada operación por lotes coincide con la operación de objetos Vector
+    """
+    result = operation(create_vector_array(*PAIRS_1), create_vector_array(*PAIRS_2))
+    expected = [operation(Vector(*a), Vector(*b)) for a, b in zip(PAIRS_1, PAIRS_2)]
+    result = result.to_vectors() if isinstance(result, VectorArray) else result.tolist()
+    assert result == expected
+
+def test_broadcast_vector(create_vector_array):
+    result = create_vector_array(*PAIRS_1) + Vector(1.0, 1.0)
+    assert result.to_vectors() == [Vector(x + 1.0, y + 1.0) for x, y in PAIRS_1]
+
+def test_scaling_and_mod(create_vector_array):
+    vectors = create_vector_array(*PAIRS_2)
+    assert (2 * vectors).to_vectors() == [2 * Vector(*p) for p in PAIRS_2]
+    assert (-vectors).to_vectors() == [-Vector(*p) for p in PAIRS_2]
+    assert vectors.mod.tolist() == pytest.approx([Vector(*p).mod for p in PAIRS_2])
+
+def test_scaling_by_array(create_vector_array):
+    """
+    Un array de NumPy a la izquierda escala cada vector por su escalar
+    """
+    result = np.array([1.0, 2.0, 3.0]) * create_vector_array(*PAIRS_2)
+    assert isinstance(result, VectorArray)
+    assert result.to_vectors() == [s * Vector(*p) for s, p in zip([1.0, 2.0, 3.0], PAIRS_2)]
+
+def test_equality_foreign(create_vector_array):
+    vectors = create_vector_array(*PAIRS_1)
+    assert (vectors == "string") is False
+    assert (vectors != "string") is True
+
+def test_length_mismatch(create_vector_array):
+    with pytest.raises(ValueError):
+        create_vector_array(*PAIRS_1) + create_vector_array(*PAIRS_2[:2])
+    with pytest.raises(TypeError):
+        create_vector_array(*PAIRS_1) + 1